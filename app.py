@@ -1,64 +1,176 @@
 # app.py
-from flask import Flask, jsonify, request, abort
+import base64
+import os
+from flask import Flask, Response, jsonify, request, abort, g
 from datetime import datetime
-from models import User, Ride, RideParticipation
+from models import User, Ride, RideParticipation, READY, CONFIRMED, REJECTED, DONE
+from store import MemoryStore
+from sqlite_store import SqliteStore
+from persistence import ArchiveSweeper, open_store, dump_store
+from cache import LRUCache
+from metrics import Metrics
 
 
 app = Flask(__name__)
 
+# Instrumentación por ruta expuesta en /metrics. SLOW_REQUEST_MS activa el
+# log de solicitudes lentas y SLOW_REQUEST_SAMPLE la fracción perfilada.
+metrics = Metrics(
+    slow_ms=float(os.environ["SLOW_REQUEST_MS"]) if os.environ.get("SLOW_REQUEST_MS") else None,
+    sample=float(os.environ.get("SLOW_REQUEST_SAMPLE", "0.01")),
+)
+metrics.init_app(app)
 
-class RideParticipation:
-    def __init__(self, participant, destination, occupiedSpaces):
-        self.participant = participant  
-        self.destination = destination
-        self.occupiedSpaces = occupiedSpaces
-        self.status = "waiting" 
-        self.confirmation = None
-
-class Ride:
-    def __init__(self, id, rideDateAndTime, finalAddress, allowedSpaces, rideDriver):
-        self.id = id
-        self.rideDateAndTime = rideDateAndTime
-        self.finalAddress = finalAddress
-        self.allowedSpaces = allowedSpaces
-        self.rideDriver = rideDriver
-        self.status = "ready"
-        self.participants = []
-
-    def remainingSpaces(self):
-        return self.allowedSpaces - sum(
-            p.occupiedSpaces for p in self.participants if p.status in ["waiting", "confirmed", "inprogress"]
-        )
-
-class User:
-    def __init__(self, alias, name, carPlate=None):
-        self.alias = alias
-        self.name = name
-        self.carPlate = carPlate
-        self.rides = [] 
-
-        self.previousRidesTotal = 0
-        self.previousRidesCompleted = 0
-        self.previousRidesMissing = 0
-        self.previousRidesNotMarked = 0
-        self.previousRidesRejected = 0
 
 # ------------------------
 # DATA HANDLER
 # ------------------------
-users = []
-rides = []
-ride_counter = 1
+store = MemoryStore()
+event_log = None
+
+# Con RIDES_DB definido, el estado vive en SQLite y varios procesos worker
+# pueden compartirlo. Si no, con RIDES_DATA_DIR cada mutación se registra en
+# un log de eventos y el estado se recupera de él al arrancar; además, con
+# RIDES_ARCHIVE_GRACE los rides terminados pasan a un archivo en disco tras
+# ese número de segundos; un hilo los busca cada RIDES_ARCHIVE_SWEEP segundos.
+if os.environ.get("RIDES_DB"):
+    store = SqliteStore(os.environ["RIDES_DB"])
+elif os.environ.get("RIDES_DATA_DIR"):
+    store, event_log = open_store(
+        os.environ["RIDES_DATA_DIR"],
+        archive_grace=float(os.environ["RIDES_ARCHIVE_GRACE"]) if os.environ.get("RIDES_ARCHIVE_GRACE") else None,
+    )
+    if store.archiveGrace is not None:
+        ArchiveSweeper(store, event_log, float(os.environ.get("RIDES_ARCHIVE_SWEEP", "30"))).start()
 
 def find_user(alias):
-    return next((u for u in users if u.alias == alias), None)
+    return store.find_user(alias)
 
 def find_ride(driver_alias, ride_id):
-    ride = next((r for r in rides if r.rideDriver.alias == driver_alias and r.id == ride_id), None)
+    ride = store.find_ride(driver_alias, ride_id)
     if not ride:
         abort(404, description=f"Ride {ride_id} no encontrado para {driver_alias}")
     return ride
 
+# Control optimista: si el cliente envía If-Match con la versión del ride que
+# leyó y otra solicitud lo modificó entretanto, se responde 409.
+def check_version(ride):
+    expected = request.headers.get("If-Match")
+    if expected is not None and expected.strip('"') != str(ride.version):
+        abort(409, description=f"Ride {ride.id} fue modificado por otra solicitud.")
+
+# Se llama dentro del lock de la mutación que registra.
+def record(event_type, **fields):
+    if event_log is not None:
+        g.eventSeq = event_log.write(event_type, **fields)
+
+# ------------------------
+# PAGINACIÓN
+# ------------------------
+STREAM_CHUNK = 500
+SEARCH_LIMIT = 100
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(str(position).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        abort(422, description="Cursor inválido.")
+
+def stream_json_array(items, start, stop, serialize):
+    yield "["
+    for chunk_start in range(start, stop, STREAM_CHUNK):
+        chunk_stop = min(chunk_start + STREAM_CHUNK, stop)
+        chunk = ",".join(app.json.dumps(serialize(item)) for item in items[chunk_start:chunk_stop])
+        yield chunk if chunk_start == start else "," + chunk
+    yield "]"
+
+# Lista paginada sobre una secuencia append-only (con len() y slicing):
+# `limit` y el cursor opaco `after` delimitan la página y X-Next-Cursor
+# apunta a la siguiente. Con `stream=1` el arreglo JSON se envía por partes
+# sin materializarlo entero.
+def paginated(items, serialize):
+    start = decode_cursor(request.args["after"]) if "after" in request.args else 0
+    total = stop = len(items)
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        if limit < 1:
+            abort(422, description="limit debe ser positivo.")
+        stop = min(stop, start + limit)
+    start = max(0, min(start, stop))
+    if request.args.get("stream") == "1":
+        response = Response(stream_json_array(items, start, stop, serialize), mimetype="application/json")
+    else:
+        response = jsonify([serialize(item) for item in items[start:stop]])
+    if stop < total:
+        response.headers["X-Next-Cursor"] = encode_cursor(stop)
+    return response
+
+# ------------------------
+# CACHÉ DE RESPUESTAS
+# ------------------------
+RESPONSE_CACHE_SIZE = 10000
+responses = LRUCache(RESPONSE_CACHE_SIZE)
+
+# Los cuerpos serializados se guardan por (entidad, versión): toda mutación
+# incrementa la versión, así que una entrada nunca queda desactualizada y
+# un If-None-Match con el ETag vigente responde 304 sin serializar nada.
+# `key` se recalcula dentro de `lock` para que clave y cuerpo coincidan.
+def cached_response(key, lock, build):
+    current = key()
+    body = responses.get(current)
+    if body is None and not request.if_none_match.contains(etag_of(current)):
+        with lock:
+            current = key()
+            body = jsonify(build()).get_data()
+        responses.put(current, body)
+    etag = etag_of(current)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+def etag_of(key):
+    return "-".join(str(part) for part in key)
+
+# La respuesta sólo sale cuando su evento está en disco.
+@app.after_request
+def commit_events(response):
+    seq = g.pop("eventSeq", None)
+    if seq is not None:
+        event_log.sync(seq)
+        if event_log.snapshot_due():
+            # Bajo los locks sólo se captura el estado; se escribe en otro hilo.
+            with store.rideLocks.all(), store.lock:
+                if event_log.snapshot_due():
+                    event_log.start_snapshot(dump_store(store))
+    return response
+
+# ------------------------
+# MÉTRICAS
+# ------------------------
+# Un solo store.counts() por scrape para todos los gauges del store.
+STORE_GAUGES = {
+    "users": ("rides_users", "Usuarios registrados."),
+    "rides": ("rides_rides", "Rides almacenados."),
+    "participations": ("rides_participations", "Participaciones almacenadas."),
+    "searchable": ("rides_searchable", "Rides disponibles para búsqueda."),
+    "archived": ("rides_archived", "Rides movidos al archivo."),
+}
+metrics.gauge_group(
+    dict(STORE_GAUGES.values()),
+    lambda: {STORE_GAUGES[key][0]: value for key, value in store.counts().items()},
+)
+metrics.gauge("rides_response_cache_entries", "Respuestas en caché.", lambda: len(responses))
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 # ------------------------
 # ENDPOINTS
 # ------------------------
@@ -66,30 +178,63 @@ def find_ride(driver_alias, ride_id):
 # USUARIOS
 @app.route("/usuarios", methods=["GET"])
 def list_users():
-    return jsonify([{
+    return paginated(store.list_users(), lambda u: {
         "alias": u.alias, "name": u.name, "carPlate": u.carPlate
-    } for u in users])
+    })
 
-@app.route("/usuarios", methods=["POST"])
-def create_user():
-    data = request.get_json()
+# Las operaciones *_one devuelven (status, mensaje) para compartirlas entre
+# los endpoints individuales y los de lote. Se llaman dentro de la
+# transacción del store.
+def create_user_one(data):
     alias = data.get("alias")
     name = data.get("name")
     carPlate = data.get("carPlate")
     if not alias or not name:
-        abort(422, description="Faltan alias o name.")
-    if any(u.alias == alias for u in users):
-        abort(422, description="Alias ya existe.")
-    user = User(alias, name, carPlate)
-    users.append(user)
-    return jsonify({"message": f"Usuario {alias} creado."}), 201
+        return 422, "Faltan alias o name."
+    if not isinstance(alias, str) or not isinstance(name, str):
+        return 422, "alias y name deben ser texto."
+    if not store.add_user(User(alias, name, carPlate),
+                          lambda user: record("user_created", alias=alias, name=name, carPlate=carPlate)):
+        return 422, "Alias ya existe."
+    return 201, f"Usuario {alias} creado."
+
+MAX_BATCH = 1000
+
+def batch_items(key):
+    body = request.get_json()
+    items = body.get(key) if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items:
+        abort(422, description=f"Falta la lista {key}.")
+    if len(items) > MAX_BATCH:
+        abort(422, description=f"Máximo {MAX_BATCH} elementos por lote.")
+    return items
+
+@app.route("/usuarios", methods=["POST"])
+def create_user():
+    data = request.get_json()
+    with store.transaction():
+        status, message = create_user_one(data if isinstance(data, dict) else {})
+    if status != 201:
+        abort(status, description=message)
+    return jsonify({"message": message}), 201
+
+@app.route("/usuarios/batch", methods=["POST"])
+def create_users_batch():
+    users = batch_items("users")
+    with store.transaction():
+        results = []
+        for data in users:
+            data = data if isinstance(data, dict) else {}
+            status, message = create_user_one(data)
+            results.append({"alias": data.get("alias"), "status": status, "message": message})
+    return jsonify({"results": results})
 
 @app.route("/usuarios/<alias>", methods=["GET"])
 def get_user(alias):
     user = find_user(alias)
     if not user:
         abort(404, description="Usuario no encontrado.")
-    return jsonify({
+    return cached_response(lambda: ("user", user.alias, user.version), user.stats_lock(), lambda: {
         "alias": user.alias,
         "name": user.name,
         "carPlate": user.carPlate,
@@ -103,19 +248,29 @@ def get_user(alias):
 # RIDES
 @app.route("/usuarios/<alias>/rides", methods=["POST"])
 def create_ride(alias):
-    global ride_counter
     driver = find_user(alias)
     if not driver:
         abort(404, description="Conductor no encontrado.")
     data = request.get_json()
+    if not isinstance(data, dict):
+        abort(422, description="Faltan datos para ride.")
     finalAddress = data.get("finalAddress")
     rideDateAndTime = data.get("rideDateAndTime")
     allowedSpaces = data.get("allowedSpaces")
     if not all([finalAddress, rideDateAndTime, allowedSpaces]):
         abort(422, description="Faltan datos para ride.")
-    ride = Ride(ride_counter, rideDateAndTime, finalAddress, allowedSpaces, driver)
-    rides.append(ride)
-    ride_counter += 1
+    if not isinstance(finalAddress, str) or not isinstance(rideDateAndTime, str):
+        abort(422, description="finalAddress y rideDateAndTime deben ser texto.")
+    if not isinstance(allowedSpaces, int) or isinstance(allowedSpaces, bool) or allowedSpaces < 1:
+        abort(422, description="allowedSpaces debe ser un entero positivo.")
+    try:
+        ride = Ride(None, rideDateAndTime, finalAddress, allowedSpaces, driver)
+    except ValueError as e:
+        abort(422, description=str(e))
+    with store.transaction():
+        store.add_ride(ride, lambda ride: record(
+            "ride_created", ride=ride.id, driver=alias, rideDateAndTime=rideDateAndTime,
+            finalAddress=finalAddress, allowedSpaces=allowedSpaces))
     return jsonify({"message": f"Ride creado con id {ride.id}"}), 201
 
 @app.route("/usuarios/<alias>/rides", methods=["GET"])
@@ -123,16 +278,21 @@ def get_user_rides(alias):
     user = find_user(alias)
     if not user:
         abort(404, description="Usuario no encontrado.")
-    user_rides = [r for r in rides if r.rideDriver.alias == alias]
-    return jsonify([{
+    return paginated(store.rides_of(alias), lambda r: {
         "id": r.id, "rideDateAndTime": r.rideDateAndTime,
         "finalAddress": r.finalAddress, "status": r.status
-    } for r in user_rides])
+    })
+
+# El detalle incluye las estadísticas de cada participante, que cambian
+# también desde otros rides: la suma de sus versiones (que sólo crecen)
+# cambia con cualquiera de ellas.
+def ride_cache_key(ride):
+    return ("ride", ride.id, ride.version, sum(p.participant.version for p in ride.participants))
 
 @app.route("/usuarios/<alias>/rides/<int:ride_id>", methods=["GET"])
 def get_ride_details(alias, ride_id):
     ride = find_ride(alias, ride_id)
-    return jsonify({
+    response = cached_response(lambda: ride_cache_key(ride), store.ride_lock(ride.id), lambda: {
         "ride": {
             "id": ride.id,
             "rideDateAndTime": ride.rideDateAndTime,
@@ -155,6 +315,23 @@ def get_ride_details(alias, ride_id):
             } for p in ride.participants]
         }
     })
+    response.headers["X-Ride-Version"] = str(ride.version)
+    return response
+
+@app.route("/rides/search", methods=["GET"])
+def search_rides():
+    limit = request.args.get("limit", SEARCH_LIMIT, type=int)
+    min_seats = request.args.get("minSeats", 1, type=int)
+    if not 1 <= limit <= MAX_BATCH:
+        abort(422, description=f"limit debe estar entre 1 y {MAX_BATCH}.")
+    results = store.search_rides(
+        start=request.args.get("from"), end=request.args.get("to"),
+        keywords=request.args.get("q", ""), min_seats=min_seats, limit=limit
+    )
+    return jsonify([{
+        "id": r.id, "driver": r.rideDriver.alias, "rideDateAndTime": r.rideDateAndTime,
+        "finalAddress": r.finalAddress, "remainingSpaces": r.remainingSpaces(), "status": r.status
+    } for r in results])
 
 # PARTICIPANTES
 @app.route("/usuarios/<alias>/rides/<int:ride_id>/requestToJoin/<participant_alias>", methods=["POST"])
@@ -163,82 +340,125 @@ def request_to_join(alias, ride_id, participant_alias):
     participant = find_user(participant_alias)
     if not participant:
         abort(404, description="Participant no encontrado.")
-    if ride.status != "ready":
-        abort(422, description="Ride ya iniciado.")
-    if any(p.participant.alias == participant_alias for p in ride.participants):
-        abort(422, description="Ya solicitaste unirte.")
     data = request.get_json()
     destination = data.get("destination")
     occupiedSpaces = data.get("occupiedSpaces")
-    if ride.remainingSpaces() < occupiedSpaces:
-        abort(422, description="No hay suficientes espacios.")
-    rp = RideParticipation(participant, destination, occupiedSpaces)
-    ride.participants.append(rp)
-    participant.rides.append(rp)
+    with store.ride_transaction(ride) as ride:
+        check_version(ride)
+        if ride.statusCode != READY:
+            abort(422, description="Ride ya iniciado.")
+        if store.find_participation(ride, participant_alias):
+            abort(422, description="Ya solicitaste unirte.")
+        if ride.remainingSpaces() < occupiedSpaces:
+            abort(422, description="No hay suficientes espacios.")
+        rp = RideParticipation(participant, destination, occupiedSpaces)
+        store.add_participation(ride, rp)
+        record("joined", ride=ride.id, alias=participant_alias, destination=destination,
+               occupiedSpaces=occupiedSpaces)
     return jsonify({"message": f"{participant_alias} solicitó unirse al ride {ride_id}."})
 
-@app.route("/usuarios/<alias>/rides/<int:ride_id>/accept/<participant_alias>", methods=["POST"])
-def accept_participant(alias, ride_id, participant_alias):
-    ride = find_ride(alias, ride_id)
-    p = next((p for p in ride.participants if p.participant.alias == participant_alias), None)
+def accept_one(ride, participant_alias):
+    p = store.find_participation(ride, participant_alias)
     if not p or p.confirmation is not None:
-        abort(422, description="Solicitud inválida.")
+        return 422, "Solicitud inválida."
     if ride.remainingSpaces() < p.occupiedSpaces:
-        abort(422, description="No hay espacios suficientes.")
-    p.confirmation = True
-    p.status = "confirmed"
-    return jsonify({"message": f"{participant_alias} aceptado."})
+        return 422, "No hay espacios suficientes."
+    try:
+        store.transition(ride, p, "confirmed")
+    except ValueError:
+        return 422, "Solicitud inválida."
+    record("accepted", ride=ride.id, alias=participant_alias)
+    return 200, f"{participant_alias} aceptado."
+
+def reject_one(ride, participant_alias):
+    p = store.find_participation(ride, participant_alias)
+    if not p or p.confirmation is not None:
+        return 422, "Solicitud inválida."
+    try:
+        store.transition(ride, p, "rejected")
+    except ValueError:
+        return 422, "Solicitud inválida."
+    record("rejected", ride=ride.id, alias=participant_alias)
+    return 200, f"{participant_alias} rechazado."
+
+def decide_one(alias, ride_id, participant_alias, operation):
+    with store.ride_transaction(find_ride(alias, ride_id)) as ride:
+        check_version(ride)
+        status, message = operation(ride, participant_alias)
+    if status != 200:
+        abort(status, description=message)
+    return jsonify({"message": message})
+
+# Un lote resuelve el ride una sola vez y aplica todas las decisiones bajo
+# una única transacción, devolviendo un resultado por participante.
+def decide_batch(alias, ride_id, operation):
+    ride = find_ride(alias, ride_id)
+    participants = batch_items("participants")
+    with store.ride_transaction(ride) as ride:
+        check_version(ride)
+        results = []
+        for participant_alias in participants:
+            if isinstance(participant_alias, str):
+                status, message = operation(ride, participant_alias)
+            else:
+                status, message = 422, "Alias inválido."
+            results.append({"alias": participant_alias, "status": status, "message": message})
+    return jsonify({"results": results})
+
+@app.route("/usuarios/<alias>/rides/<int:ride_id>/accept/<participant_alias>", methods=["POST"])
+def accept_participant(alias, ride_id, participant_alias):
+    return decide_one(alias, ride_id, participant_alias, accept_one)
 
 @app.route("/usuarios/<alias>/rides/<int:ride_id>/reject/<participant_alias>", methods=["POST"])
 def reject_participant(alias, ride_id, participant_alias):
-    ride = find_ride(alias, ride_id)
-    p = next((p for p in ride.participants if p.participant.alias == participant_alias), None)
-    if not p or p.confirmation is not None:
-        abort(422, description="Solicitud inválida.")
-    p.confirmation = False
-    p.status = "rejected"
-    p.participant.previousRidesRejected += 1
-    return jsonify({"message": f"{participant_alias} rechazado."})
+    return decide_one(alias, ride_id, participant_alias, reject_one)
+
+@app.route("/usuarios/<alias>/rides/<int:ride_id>/accept", methods=["POST"])
+def accept_participants_batch(alias, ride_id):
+    return decide_batch(alias, ride_id, accept_one)
+
+@app.route("/usuarios/<alias>/rides/<int:ride_id>/reject", methods=["POST"])
+def reject_participants_batch(alias, ride_id):
+    return decide_batch(alias, ride_id, reject_one)
 
 @app.route("/usuarios/<alias>/rides/<int:ride_id>/start", methods=["POST"])
 def start_ride(alias, ride_id):
-    ride = find_ride(alias, ride_id)
-    if any(p.status not in ["confirmed", "rejected"] for p in ride.participants):
-        abort(422, description="Hay solicitudes sin procesar.")
-    for p in ride.participants:
-        if p.status == "confirmed":
-            p.status = "inprogress"
-        elif p.status == "waiting":
-            p.status = "missing"
-    ride.status = "inprogress"
+    with store.ride_transaction(find_ride(alias, ride_id)) as ride:
+        check_version(ride)
+        if ride.statusCode == DONE:
+            abort(422, description="Ride ya terminado.")
+        if any(p.statusCode not in (CONFIRMED, REJECTED) for p in ride.participants):
+            abort(422, description="Hay solicitudes sin procesar.")
+        store.start_ride(ride)
+        record("started", ride=ride.id)
     return jsonify({"message": f"Ride {ride_id} iniciado."})
 
 @app.route("/usuarios/<alias>/rides/<int:ride_id>/end", methods=["POST"])
 def end_ride(alias, ride_id):
-    ride = find_ride(alias, ride_id)
-    for p in ride.participants:
-        if p.status == "inprogress":
-            p.status = "notmarked"
-            p.participant.previousRidesNotMarked += 1
-        elif p.status == "confirmed":
-            p.participant.previousRidesCompleted += 1
-        elif p.status == "missing":
-            p.participant.previousRidesMissing += 1
-        p.participant.previousRidesTotal += 1
-    ride.status = "done"
+    with store.ride_transaction(find_ride(alias, ride_id)) as ride:
+        check_version(ride)
+        # Un ride terminado no cambia más (y puede estar ya archivado).
+        if ride.statusCode == DONE:
+            abort(422, description="Ride ya terminado.")
+        store.end_ride(ride)
+        record("ended", ride=ride.id)
     return jsonify({"message": f"Ride {ride_id} terminado."})
 
 @app.route("/usuarios/<alias>/rides/<int:ride_id>/unloadParticipant", methods=["POST"])
 def unload_participant(alias, ride_id):
-    ride = next((r for r in rides if r.id == ride_id), None)
+    ride = store.find_ride_by_id(ride_id)
     if not ride:
         abort(404, description="Ride no encontrado.")
-    p = next((p for p in ride.participants if p.participant.alias == alias), None)
-    if not p or p.status != "inprogress":
-        abort(422, description="No puedes bajarte ahora.")
-    p.status = "done"
-    p.participant.previousRidesCompleted += 1
-    p.participant.previousRidesTotal += 1
+    with store.ride_transaction(ride) as ride:
+        check_version(ride)
+        p = store.find_participation(ride, alias)
+        if not p:
+            abort(422, description="No puedes bajarte ahora.")
+        try:
+            store.transition(ride, p, "done")
+        except ValueError:
+            abort(422, description="No puedes bajarte ahora.")
+        record("unloaded", ride=ride.id, alias=alias)
     return jsonify({"message": f"{alias} se bajó del ride {ride_id}."})
 
 if __name__ == "__main__":
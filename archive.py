@@ -0,0 +1,113 @@
+# archive.py
+import json
+import mmap
+import os
+import threading
+
+from models import Ride, RideParticipation
+
+
+# Fila compacta de un ride (también la usan los snapshots).
+def ride_row(ride):
+    return [ride.id, ride.rideDateAndTime, ride.finalAddress, ride.allowedSpaces, ride.rideDriver.alias,
+            ride.status, ride.version,
+            [[p.participant.alias, p.destination, p.occupiedSpaces, p.status, p.confirmation]
+             for p in ride.participants]]
+
+def ride_from_row(row, find_user):
+    ride_id, dt, address, spaces, driver, status, version, participants = row
+    ride = Ride(ride_id, dt, address, spaces, find_user(driver))
+    ride.status = status
+    for alias, destination, occupied, p_status, confirmation in participants:
+        rp = RideParticipation(find_user(alias), destination, occupied)
+        rp.status = p_status
+        rp.confirmation = confirmation
+        ride.addParticipant(rp)
+    ride.version = version
+    return ride
+
+
+class RideArchive:
+    # Archivo append-only con una fila JSON por ride terminado. En memoria
+    # sólo queda el offset de cada ride; las filas se leen bajo demanda a
+    # través de mmap.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = {}     # ride id -> offset de su fila
+        # (ride id, driver alias) de las filas leídas al abrir; el store los
+        # toma una vez para reconstruir sus listas por conductor.
+        self.recovered = []
+        self._map = None
+        self._scan()
+        self._file = open(path, "ab")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, ride_id):
+        return ride_id in self._offsets
+
+    # Reconstruye el índice; una última fila incompleta (caída a mitad de
+    # escritura) se descarta.
+    def _scan(self):
+        if not os.path.exists(self.path):
+            return
+        valid = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    break
+                self._offsets[row[0]] = valid
+                self.recovered.append((row[0], row[4]))
+                valid += len(line)
+        with open(self.path, "r+b") as f:
+            f.truncate(valid)
+
+    def max_id(self):
+        return max(self._offsets, default=0)
+
+    # Escribe la fila sin indexarla todavía: el ride sigue vivo hasta que
+    # add() lo registre. Devuelve el offset.
+    def write(self, ride):
+        line = json.dumps(ride_row(ride), separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            return offset
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def add(self, ride, offset):
+        with self._lock:
+            self._offsets[ride.id] = offset
+
+    # Las filas ya indexadas están sincronizadas, así que el mmap las ve. Si
+    # el archivo creció se mapea de nuevo; los mapas anteriores siguen
+    # válidos para quien los esté leyendo.
+    def _mapping(self, offset):
+        current = self._map
+        if current is None or offset >= len(current):
+            with self._lock:
+                self._file.flush()
+                with open(self.path, "rb") as f:
+                    current = self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return current
+
+    def get(self, ride_id, find_user):
+        offset = self._offsets.get(ride_id)
+        if offset is None:
+            return None
+        view = self._mapping(offset)
+        return ride_from_row(json.loads(view[offset:view.find(b"\n", offset)]), find_user)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,73 @@
+# benchmarks/bench_archive.py
+#
+# Memoria del conjunto vivo (tracemalloc) y latencia de lectura con un
+# historial de rides terminados, sin archivo frente a con archivo. También
+# mide el detalle de un ride archivado, que se lee por mmap.
+# Uso: python benchmarks/bench_archive.py [historial ...]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from archive import RideArchive
+from cache import LRUCache
+from models import User, Ride, RideParticipation
+from store import MemoryStore
+
+ACTIVE = 1000
+USERS = 1000
+READS = 5000
+
+
+def build(history, directory):
+    tracemalloc.start()
+    store = MemoryStore()
+    if directory is not None:
+        store.enable_archive(RideArchive(os.path.join(directory, "archive.jsonl")), 0)
+    users = [store.add_user(User(f"u{i}", f"Usuario {i}")) for i in range(USERS)]
+    for i in range(history + ACTIVE):
+        ride = store.add_ride(Ride(None, "2025-07-15 22:00", "UTEC Barranco", 4, users[i % USERS]))
+        rp = store.add_participation(ride, RideParticipation(users[(i + 1) % USERS], "Barranco", 1))
+        if i < history:
+            ride.accept(rp)
+            store.start_ride(ride)
+            store.end_ride(ride)
+    store.archive_due()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, memory
+
+
+def read_latency(paths):
+    client = app_module.app.test_client()
+    app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+    start = time.perf_counter()
+    for i in range(READS):
+        client.get(paths[i % len(paths)])
+    return (time.perf_counter() - start) / READS * 1e6
+
+
+def main(sizes):
+    print(f"{'historial':>10} {'modo':>12} {'memoria MB':>11} {'detalle activo':>15} {'detalle archivado':>18}")
+    for history in sizes:
+        active = [f"/usuarios/u{i % USERS}/rides/{i + 1}" for i in range(history, history + ACTIVE)]
+        done = [f"/usuarios/u{i % USERS}/rides/{i + 1}" for i in range(min(history, ACTIVE))]
+        for label in ("sin archivo", "con archivo"):
+            with tempfile.TemporaryDirectory() as tmp:
+                store, memory = build(history, tmp if label == "con archivo" else None)
+                app_module.store = store
+                hot = read_latency(active)
+                cold = read_latency(done)
+                print(f"{history:>10} {label:>12} {memory / 1e6:>11.1f} {hot:>12.1f} µs {cold:>15.1f} µs")
+                if store.archive is not None:
+                    store.archive.close()
+    app_module.store = MemoryStore()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,56 @@
+# benchmarks/bench_batch.py
+#
+# Solicitudes y latencia total: endpoints individuales frente a los de lote
+# para (a) dar de alta una cohorte de usuarios y (b) aceptar las solicitudes
+# de un ride.
+# Uso: python benchmarks/bench_batch.py [cohorte] [participantes]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from models import User, Ride, RideParticipation
+from store import MemoryStore
+
+
+def timed(calls):
+    start = time.perf_counter()
+    for call in calls:
+        call()
+    return len(calls), (time.perf_counter() - start) * 1000
+
+
+def prepare_ride(participants):
+    store = app_module.store = MemoryStore()
+    driver = store.add_user(User("driver", "Driver"))
+    ride = store.add_ride(Ride(store.next_ride_id(), "2025-07-15 22:00", "UTEC", participants * 2, driver))
+    for i in range(participants):
+        store.add_participation(ride, RideParticipation(store.add_user(User(f"p{i}", "P")), "Destino", 1))
+    return [f"p{i}" for i in range(participants)]
+
+
+def main(cohort, participants):
+    client = app_module.app.test_client()
+    users = [{"alias": f"u{i}", "name": f"U {i}"} for i in range(cohort)]
+
+    app_module.store = MemoryStore()
+    single = timed([lambda u=u: client.post("/usuarios", json=u) for u in users])
+    app_module.store = MemoryStore()
+    batch = timed([lambda: client.post("/usuarios/batch", json={"users": users})])
+    print(f"alta de {cohort} usuarios:   individual {single[0]:>5} solicitudes {single[1]:8.1f} ms"
+          f" | lote {batch[0]:>3} solicitud  {batch[1]:8.1f} ms")
+
+    aliases = prepare_ride(participants)
+    single = timed([lambda a=a: client.post(f"/usuarios/driver/rides/1/accept/{a}") for a in aliases])
+    aliases = prepare_ride(participants)
+    batch = timed([lambda: client.post("/usuarios/driver/rides/1/accept", json={"participants": aliases})])
+    print(f"aceptar {participants} solicitudes: individual {single[0]:>5} solicitudes {single[1]:8.1f} ms"
+          f" | lote {batch[0]:>3} solicitud  {batch[1]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 1000, args[1] if len(args) > 1 else 40)
@@ -0,0 +1,60 @@
+# benchmarks/bench_concurrency.py
+#
+# Throughput de requestToJoin con locks por ride (striped) frente a un único
+# lock global (MemoryStore con un solo stripe), usando varios hilos.
+# Uso: python benchmarks/bench_concurrency.py [threads]
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from models import User, Ride
+from store import MemoryStore
+
+RIDES = 200
+JOINS_PER_RIDE = 50
+
+
+def setup(stripes):
+    store = MemoryStore(stripes=stripes)
+    driver = store.add_user(User("driver", "Driver"))
+    for i in range(RIDES * JOINS_PER_RIDE):
+        store.add_user(User(f"p{i}", f"P {i}"))
+    for _ in range(RIDES):
+        store.add_ride(Ride(store.next_ride_id(), "2025-07-15 22:00", "UTEC", JOINS_PER_RIDE, driver))
+    app_module.store = store
+
+
+def run(threads):
+    local = threading.local()
+
+    def join(i):
+        if not hasattr(local, "client"):
+            local.client = app_module.app.test_client()
+        ride_id = i % RIDES + 1
+        return local.client.post(f"/usuarios/driver/rides/{ride_id}/requestToJoin/p{i}", json={
+            "destination": "Destino", "occupiedSpaces": 1
+        }).status_code
+
+    total = RIDES * JOINS_PER_RIDE
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        codes = list(pool.map(join, range(total)))
+    elapsed = time.perf_counter() - start
+    assert codes.count(200) == total
+    return total / elapsed
+
+
+def main(threads):
+    for label, stripes in (("global lock", 1), ("striped (64)", 64)):
+        setup(stripes)
+        print(f"{label:>14}: {run(threads):10.0f} joins/s con {threads} hilos")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
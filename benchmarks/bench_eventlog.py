@@ -0,0 +1,109 @@
+# benchmarks/bench_eventlog.py
+#
+# 1) Escrituras durables por segundo del EventLog (group commit) según el
+#    número de hilos concurrentes.
+# 2) Tiempo de arranque con N eventos: replay completo frente a
+#    snapshot + cola del log.
+# Uso: python benchmarks/bench_eventlog.py [n_events]
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import EventLog, open_store, dump_store
+
+WRITES = 5000
+USERS = 10000
+TAIL = 10000
+
+
+def write_throughput(threads):
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(tmp)
+        log.recover()
+        log.open()
+
+        def write(i):
+            log.sync(log.write("user_created", alias=f"u{i}", name="U", carPlate=None))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(write, range(WRITES)))
+        elapsed = time.perf_counter() - start
+        log.close()
+    return WRITES / elapsed
+
+
+def generate(log, n_events):
+    written = 0
+    for i in range(USERS):
+        log.write("user_created", alias=f"u{i}", name=f"U {i}", carPlate=None)
+        written += 1
+    ride_id = 0
+    while written < n_events:
+        ride_id += 1
+        driver, a, b = (f"u{(ride_id + k) % USERS}" for k in (0, 1, 2))
+        log.write("ride_created", ride=ride_id, driver=driver, rideDateAndTime="2025-07-15 22:00",
+                  finalAddress="UTEC", allowedSpaces=4)
+        for alias in (a, b):
+            log.write("joined", ride=ride_id, alias=alias, destination="Barranco", occupiedSpaces=1)
+        for alias in (a, b):
+            log.write("accepted", ride=ride_id, alias=alias)
+        log.write("started", ride=ride_id)
+        log.write("ended", ride=ride_id)
+        written += 7
+    log.sync(log._seq)
+    return written
+
+
+def restart_time(directory):
+    start = time.perf_counter()
+    store, log = open_store(directory, snapshot_every=sys.maxsize)
+    elapsed = time.perf_counter() - start
+    log.close()
+    return elapsed, store
+
+
+def main(n_events):
+    for threads in (1, 4, 16, 64):
+        print(f"escrituras durables con {threads:>2} hilos: {write_throughput(threads):10.0f} ops/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(tmp)
+        log.recover()
+        log.open()
+        total = generate(log, n_events - TAIL)
+        log.close()
+        _, store = restart_time(tmp)
+
+        # Snapshot del estado actual y una cola de TAIL eventos más.
+        log = EventLog(tmp, snapshot_every=sys.maxsize)
+        for _ in log.recover()[1]:
+            pass
+        log.open()
+        log.write_snapshot(dump_store(store))
+        for i in range(TAIL):
+            log.write("user_created", alias=f"tail{i}", name="T", carPlate=None)
+        log.sync(log._seq)
+        log.close()
+        total += TAIL
+        snapshot_elapsed, _ = restart_time(tmp)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(tmp)
+        log.recover()
+        log.open()
+        generate(log, n_events)
+        log.close()
+        replay_elapsed, _ = restart_time(tmp)
+
+    print(f"arranque con {total} eventos, replay completo:      {replay_elapsed:6.2f} s")
+    print(f"arranque con {total} eventos, snapshot + {TAIL} de cola: {snapshot_elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,81 @@
+# benchmarks/bench_memory.py
+#
+# Bytes por objeto (tracemalloc) de User, Ride y RideParticipation: clases
+# originales basadas en __dict__ frente a las actuales con __slots__ y
+# estados como enteros.
+# Uso: python benchmarks/bench_memory.py [n ...]
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+
+
+# Réplica de los modelos originales, para comparar.
+class LegacyRideParticipation:
+    def __init__(self, participant, destination, occupiedSpaces):
+        self.participant = participant
+        self.destination = destination
+        self.occupiedSpaces = occupiedSpaces
+        self.status = "waiting"
+        self.confirmation = None
+
+class LegacyRide:
+    def __init__(self, id, rideDateAndTime, finalAddress, allowedSpaces, rideDriver):
+        self.id = id
+        self.rideDateAndTime = rideDateAndTime
+        self.finalAddress = finalAddress
+        self.allowedSpaces = allowedSpaces
+        self.rideDriver = rideDriver
+        self.status = "ready"
+        self.participants = []
+
+class LegacyUser:
+    def __init__(self, alias, name, carPlate=None):
+        self.alias = alias
+        self.name = name
+        self.carPlate = carPlate
+        self.rides = []
+        self.previousRidesTotal = 0
+        self.previousRidesCompleted = 0
+        self.previousRidesMissing = 0
+        self.previousRidesNotMarked = 0
+        self.previousRidesRejected = 0
+
+# Los strings se crean antes de medir: sólo cuenta el costo de los objetos.
+DESTINATION, DATE, ADDRESS, NAME = "Barranco", "2025-07-15 22:00", "UTEC", "Nombre"
+
+
+def bytes_per(n, build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / n
+
+
+def measure(n, User, Ride, RideParticipation):
+    aliases = [f"u{i}" for i in range(n)]
+    users = bytes_per(n, lambda n: [User(aliases[i], NAME) for i in range(n)])
+    driver = User("driver", NAME)
+    rides = bytes_per(n, lambda n: [Ride(i, DATE, ADDRESS, 4, driver) for i in range(n)])
+    participations = bytes_per(n, lambda n: [RideParticipation(driver, DESTINATION, 1) for _ in range(n)])
+    return users, rides, participations
+
+
+def main(sizes):
+    print(f"{'n':>9} {'modelos':>10} {'User':>8} {'Ride':>8} {'Participation':>14}  (bytes/objeto)")
+    for n in sizes:
+        for label, classes in (("antes", (LegacyUser, LegacyRide, LegacyRideParticipation)),
+                               ("después", (models.User, models.Ride, models.RideParticipation))):
+            users, rides, participations = measure(n, *classes)
+            print(f"{n:>9} {label:>10} {users:>8.0f} {rides:>8.0f} {participations:>14.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100000, 1000000])
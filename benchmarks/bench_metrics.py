@@ -0,0 +1,63 @@
+# benchmarks/bench_metrics.py
+#
+# Sobrecosto de la instrumentación por solicitud: (1) los hooks
+# before/after ejecutados directamente dentro de un contexto de solicitud y
+# (2) extremo a extremo, GET /usuarios/<alias> con y sin Metrics instalado.
+# Uso: python benchmarks/bench_metrics.py [iteraciones]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, request
+
+from metrics import Metrics
+
+
+def hooks_us(iterations):
+    app = Flask(__name__)
+    metrics = Metrics()
+
+    @app.route("/usuarios/<alias>")
+    def get_user(alias):
+        return alias
+
+    response = Response("ok")
+    with app.test_request_context("/usuarios/ana"):
+        request.url_rule = app.url_map.bind("localhost").match("/usuarios/ana", return_rule=True)[0]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            metrics._before()
+            metrics._after(response)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+
+def end_to_end_us(iterations, instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        Metrics().init_app(app)
+
+    @app.route("/usuarios/<alias>")
+    def get_user(alias):
+        return alias
+
+    client = app.test_client()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        client.get("/usuarios/ana")
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations):
+    print(f"hooks before/after:          {hooks_us(iterations * 10):6.2f} µs/solicitud")
+    plain = end_to_end_us(iterations, False)
+    instrumented = end_to_end_us(iterations, True)
+    print(f"GET sin métricas:            {plain:6.1f} µs/solicitud")
+    print(f"GET con métricas:            {instrumented:6.1f} µs/solicitud "
+          f"(+{instrumented - plain:.1f} µs)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
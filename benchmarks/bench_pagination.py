@@ -0,0 +1,50 @@
+# benchmarks/bench_pagination.py
+#
+# Memoria pico (tracemalloc) y tiempo hasta el primer byte de GET /usuarios:
+# respuesta completa, streaming y una página de 100 con cursor.
+# Uso: python benchmarks/bench_pagination.py [n_users ...]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from models import User
+from store import MemoryStore
+
+
+def measure(client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    chunks = iter(response.response)
+    next(chunks)
+    ttfb = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, ttfb
+
+
+def main(sizes):
+    client = app_module.app.test_client()
+    print(f"{'usuarios':>10} {'modo':>10} {'pico (KiB)':>12} {'TTFB (ms)':>10}")
+    for n in sizes:
+        app_module.store = MemoryStore()
+        for i in range(n):
+            app_module.store.add_user(User(f"u{i}", f"Usuario {i}", f"PLACA{i}"))
+        middle = app_module.encode_cursor(n // 2)
+        for mode, url in (("completo", "/usuarios"),
+                          ("stream", "/usuarios?stream=1"),
+                          ("página", f"/usuarios?limit=100&after={middle}")):
+            peak, ttfb = measure(client, url)
+            print(f"{n:>10} {mode:>10} {peak / 1024:>12.0f} {ttfb * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000, 1000000])
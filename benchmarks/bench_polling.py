@@ -0,0 +1,51 @@
+# benchmarks/bench_polling.py
+#
+# Costo de sondear el detalle de un ride con muchos participantes:
+# serialización completa en cada GET (caché vacía), GET servido desde la
+# caché y GET condicional con If-None-Match (304).
+# Uso: python benchmarks/bench_polling.py [participantes] [sondeos]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from cache import LRUCache
+from models import User, Ride, RideParticipation
+from store import MemoryStore
+
+URL = "/usuarios/driver/rides/1"
+
+
+def setup(participants):
+    store = app_module.store = MemoryStore()
+    driver = store.add_user(User("driver", "Driver"))
+    ride = store.add_ride(Ride(store.next_ride_id(), "2025-07-15 22:00", "UTEC", participants, driver))
+    for i in range(participants):
+        store.add_participation(ride, RideParticipation(store.add_user(User(f"p{i}", "P")), "Destino", 1))
+
+
+def per_poll_us(client, polls, headers=None, clear=False):
+    start = time.perf_counter()
+    for _ in range(polls):
+        if clear:
+            app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        client.get(URL, headers=headers)
+    return (time.perf_counter() - start) / polls * 1e6
+
+
+def main(participants, polls):
+    setup(participants)
+    client = app_module.app.test_client()
+    etag = client.get(URL).headers["ETag"]
+    print(f"ride con {participants} participantes, {polls} sondeos (µs/sondeo)")
+    print(f"  sin caché:        {per_poll_us(client, polls, clear=True):8.1f}")
+    print(f"  desde la caché:   {per_poll_us(client, polls):8.1f}")
+    print(f"  If-None-Match:    {per_poll_us(client, polls, headers={'If-None-Match': etag}):8.1f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 40, args[1] if len(args) > 1 else 2000)
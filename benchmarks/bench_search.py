@@ -0,0 +1,54 @@
+# benchmarks/bench_search.py
+#
+# Latencia de RideIndex.search con un tamaño de resultado fijo a medida que
+# crece el total de rides: por ventana de tiempo y por palabra clave.
+# Uso: python benchmarks/bench_search.py [n_rides ...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import User, Ride
+from store import MemoryStore
+
+QUERIES = 2000
+DISTRICTS = ["Barranco", "Miraflores", "San Isidro", "Surco", "Lima", "Chorrillos", "La Molina"]
+
+
+def build(n_rides):
+    store = MemoryStore()
+    driver = store.add_user(User("driver", "Driver"))
+    for i in range(n_rides):
+        minute = i % (60 * 24 * 365)
+        dt = f"2025-{1 + minute // (60 * 24 * 31) % 12:02d}-{1 + minute // (60 * 24) % 28:02d} " \
+             f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+        address = f"Calle {i} {DISTRICTS[i % len(DISTRICTS)]}"
+        store.add_ride(Ride(store.next_ride_id(), dt, address, 4, driver))
+    # Un destino raro con 20 rides, para medir búsquedas por palabra clave.
+    for i in range(20):
+        store.add_ride(Ride(store.next_ride_id(), f"2025-06-01 {i:02d}:00", "Pachacamac", 4, driver))
+    return store
+
+
+def per_query_us(fn):
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        fn()
+    return (time.perf_counter() - start) / QUERIES * 1e6
+
+
+def main(sizes):
+    print(f"{'rides':>10} {'ventana (20)':>14} {'q=pachacamac':>14}  (µs/consulta)")
+    for n in sizes:
+        store = build(n)
+        window = store.search_rides(start="2025-06-01 00:00", limit=20)
+        assert len(window) == 20
+        print(f"{n:>10} "
+              f"{per_query_us(lambda: store.search_rides(start='2025-06-01 00:00', limit=20)):>14.1f} "
+              f"{per_query_us(lambda: store.search_rides(keywords='pachacamac')):>14.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000, 1000000])
@@ -0,0 +1,77 @@
+# benchmarks/bench_sqlite.py
+#
+# Throughput de la app sobre SqliteStore con 1 frente a N procesos worker
+# compartiendo el mismo archivo. Cada worker mezcla requestToJoin (escritura
+# con validación de espacios en una transacción) y lecturas del detalle del
+# ride; se compara también con MemoryStore en un solo proceso.
+# Uso: python benchmarks/bench_sqlite.py [workers]
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from models import User, Ride
+from sqlite_store import SqliteStore
+from store import MemoryStore
+
+RIDES = 200
+OPS_PER_WORKER = 4000
+READS_PER_WRITE = 3
+
+
+def setup(store, workers):
+    driver = store.add_user(User("driver", "Driver"))
+    for i in range(workers * OPS_PER_WORKER // (READS_PER_WRITE + 1)):
+        store.add_user(User(f"p{i}", f"P {i}"))
+    for _ in range(RIDES):
+        store.add_ride(Ride(None, "2025-07-15 22:00", "UTEC", OPS_PER_WORKER, driver))
+
+
+# Cada worker reporta sus operaciones y su tiempo; el throughput total es
+# la suma de operaciones sobre el worker más lento.
+def worker(path, index, workers):
+    if path is not None:
+        app_module.store = SqliteStore(path)
+    client = app_module.app.test_client()
+    start = time.perf_counter()
+    for i in range(OPS_PER_WORKER):
+        ride_id = i % RIDES + 1
+        if i % (READS_PER_WRITE + 1) == 0:
+            alias = f"p{i // (READS_PER_WRITE + 1) * workers + index}"
+            client.post(f"/usuarios/driver/rides/{ride_id}/requestToJoin/{alias}",
+                        json={"destination": "Barranco", "occupiedSpaces": 1})
+        else:
+            client.get(f"/usuarios/driver/rides/{ride_id}")
+    return OPS_PER_WORKER, time.perf_counter() - start
+
+
+def run(path, workers):
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        results = pool.starmap(worker, [(path, i, workers) for i in range(workers)])
+    ops = sum(r[0] for r in results)
+    return ops / max(r[1] for r in results)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 4
+
+    store = app_module.store = MemoryStore()
+    setup(store, 1)
+    print(f"MemoryStore, 1 proceso:{run(None, 1):>12.0f} ops/s")
+
+    for n in (1, workers):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rides.db")
+            store = SqliteStore(path)
+            setup(store, n)
+            store.close()
+            print(f"SqliteStore, {n} proceso(s):{run(path, n):>8.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
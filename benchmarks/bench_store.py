@@ -0,0 +1,51 @@
+# benchmarks/bench_store.py
+#
+# Latencia de búsqueda del MemoryStore a distintos tamaños de dataset.
+# Uso: python benchmarks/bench_store.py [n_rides ...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import User, Ride, RideParticipation
+from store import MemoryStore
+
+DRIVERS = 1000
+LOOKUPS = 100000
+
+
+def build(n_rides):
+    store = MemoryStore()
+    drivers = [store.add_user(User(f"driver{i}", f"Driver {i}")) for i in range(DRIVERS)]
+    for i in range(n_rides):
+        ride = Ride(store.next_ride_id(), "2025-07-15 22:00", "UTEC", 4, drivers[i % DRIVERS])
+        store.add_ride(ride)
+    ride = store.find_ride_by_id(n_rides)
+    store.add_participation(ride, RideParticipation(drivers[0], "Destino", 1))
+    return store
+
+
+def per_op_ns(fn, *args):
+    start = time.perf_counter_ns()
+    for _ in range(LOOKUPS):
+        fn(*args)
+    return (time.perf_counter_ns() - start) / LOOKUPS
+
+
+def main(sizes):
+    print(f"{'rides':>10} {'find_user':>12} {'find_ride':>12} {'by_id':>12} {'participation':>14}  (ns/op)")
+    for n in sizes:
+        store = build(n)
+        last = store.find_ride_by_id(n)
+        driver_alias = last.rideDriver.alias
+        print(f"{n:>10} "
+              f"{per_op_ns(store.find_user, 'driver999'):>12.0f} "
+              f"{per_op_ns(store.find_ride, driver_alias, n):>12.0f} "
+              f"{per_op_ns(store.find_ride_by_id, n):>12.0f} "
+              f"{per_op_ns(store.find_participation, last, 'driver0'):>14.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000, 1000000])
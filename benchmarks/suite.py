@@ -0,0 +1,283 @@
+# benchmarks/suite.py
+#
+# Suite de carga: ejecuta workloads sintéticos (alta de usuarios, creación
+# de rides, ráfagas de solicitudes, ciclos accept/start/end y sondeo de
+# detalles) o reproduce tráfico grabado en JSONL contra la app Flask, con
+# datasets precargados de tamaño creciente. Reporta ops/s y p50/p95/p99 por
+# ruta y guarda el resultado en JSON para comparar corridas.
+#
+# Uso:
+#   python benchmarks/suite.py --sizes 1000 10000 --out results.json
+#   python benchmarks/suite.py --mode server --threads 8
+#   python benchmarks/suite.py --replay traffic.jsonl
+#   python benchmarks/suite.py --compare baseline.json --out results.json
+#
+# Cada línea del JSONL de replay es {"method": ..., "path": ..., "json": ...,
+# "headers": ...}; las líneas sin method/path se ignoran.
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+
+import app as app_module
+from cache import LRUCache
+from models import User, Ride, RideParticipation
+from store import MemoryStore
+
+OPS = 2000
+REGRESSION_THRESHOLD = 0.2
+
+
+# ------------------------
+# DATASET Y WORKLOADS
+# ------------------------
+def preload(size):
+    store = app_module.store = MemoryStore()
+    app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+    users = [store.add_user(User(f"user{i}", f"Usuario {i}")) for i in range(size)]
+    for i in range(size):
+        ride = store.add_ride(Ride(store.next_ride_id(), f"2025-07-{1 + i % 28:02d} {i % 24:02d}:00",
+                                   "UTEC Barranco", 4, users[i]))
+        store.add_participation(ride, RideParticipation(users[(i + 1) % size], "Barranco", 1))
+
+
+def onboarding(size, ops):
+    for i in range(ops):
+        yield "POST", "/usuarios", {"alias": f"new{i}", "name": f"Nuevo {i}"}
+
+
+def ride_creation(size, ops):
+    for i in range(ops):
+        yield "POST", f"/usuarios/user{i % size}/rides", {
+            "finalAddress": "UTEC Barranco", "rideDateAndTime": "2025-08-01 08:00", "allowedSpaces": 4
+        }
+
+
+def join_storm(size, ops):
+    yield "POST", "/usuarios/user0/rides", {
+        "finalAddress": "UTEC", "rideDateAndTime": "2025-08-01 08:00", "allowedSpaces": ops // 2
+    }
+    ride_id = size + 1
+    for i in range(1, ops):
+        yield "POST", f"/usuarios/user0/rides/{ride_id}/requestToJoin/user{i % size}", {
+            "destination": "Barranco", "occupiedSpaces": 1
+        }
+
+
+def lifecycle(size, ops):
+    # Cada ride precargado i tiene como participante a user{i+1}.
+    for i in range(min(size, ops // 3)):
+        ride = f"/usuarios/user{i}/rides/{i + 1}"
+        yield "POST", f"{ride}/accept/user{(i + 1) % size}", None
+        yield "POST", f"{ride}/start", None
+        yield "POST", f"{ride}/end", None
+
+
+def polling(size, ops):
+    for i in range(ops):
+        j = i % min(size, 100)
+        yield "GET", f"/usuarios/user{j}/rides/{j + 1}", None
+        yield "GET", f"/usuarios/user{j}", None
+
+
+def search(size, ops):
+    for i in range(ops):
+        yield "GET", f"/rides/search?from=2025-07-{1 + i % 28:02d}&q=utec&limit=20", None
+
+
+WORKLOADS = {
+    "onboarding": onboarding,
+    "ride_creation": ride_creation,
+    "join_storm": join_storm,
+    "lifecycle": lifecycle,
+    "polling": polling,
+    "search": search,
+}
+
+
+def load_replay(path):
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "method" in entry and "path" in entry:
+                calls.append((entry["method"].upper(), entry["path"], entry.get("json"), entry.get("headers")))
+    return calls
+
+
+# ------------------------
+# EJECUCIÓN
+# ------------------------
+def route_of(method, path):
+    adapter = app_module.app.url_map.bind("localhost")
+    try:
+        rule, _ = adapter.match(path.split("?")[0], method, return_rule=True)
+        return f"{method} {rule.rule}"
+    except Exception:
+        return f"{method} <sin ruta>"
+
+
+class ClientTransport:
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, method, path, body, headers):
+        if not hasattr(self._local, "client"):
+            self._local.client = app_module.app.test_client()
+        return self._local.client.open(path, method=method, json=body, headers=headers).status_code
+
+    def close(self):
+        pass
+
+
+class ServerTransport:
+    # Servidor WSGI multihilo local; cada hilo del benchmark usa su conexión.
+    def __init__(self):
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self._server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._local = threading.local()
+
+    def __call__(self, method, path, body, headers):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = http.client.HTTPConnection("127.0.0.1", self._server.server_port)
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        self._local.conn.request(method, path, body=payload, headers=headers)
+        response = self._local.conn.getresponse()
+        response.read()
+        return response.status
+
+    def close(self):
+        self._server.shutdown()
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank.
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run(transport, calls, threads):
+    latencies = {}
+    statuses = {}
+    lock = threading.Lock()
+
+    def call(entry):
+        method, path, body, headers = entry
+        start = time.perf_counter()
+        status = transport(method, path, body, headers)
+        elapsed = time.perf_counter() - start
+        route = route_of(method, path)
+        with lock:
+            latencies.setdefault(route, []).append(elapsed)
+            statuses.setdefault(route, {}).setdefault(str(status), 0)
+            statuses[route][str(status)] += 1
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(call, calls))
+    else:
+        for entry in calls:
+            call(entry)
+    wall = time.perf_counter() - start
+
+    report = {}
+    for route, values in sorted(latencies.items()):
+        values.sort()
+        report[route] = {
+            "count": len(values),
+            "ops_per_sec": round(len(values) / wall, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "statuses": statuses[route],
+        }
+    return report
+
+
+def compare(baseline, results):
+    regressions = []
+    previous = {(r["size"], r["workload"]): r["routes"] for r in baseline["results"]}
+    for r in results:
+        for route, stats in r["routes"].items():
+            before = previous.get((r["size"], r["workload"]), {}).get(route)
+            if before and before["p95_ms"] > 0 and \
+                    stats["p95_ms"] > before["p95_ms"] * (1 + REGRESSION_THRESHOLD):
+                regressions.append(f"{r['workload']} size={r['size']} {route}: "
+                                   f"p95 {before['p95_ms']} -> {stats['p95_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--ops", type=int, default=OPS)
+    parser.add_argument("--mode", choices=("client", "server"), default="client")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--replay", help="JSONL con tráfico grabado")
+    parser.add_argument("--out", help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    transport = ServerTransport() if args.mode == "server" else ClientTransport()
+    workloads = {"replay": lambda size, ops: load_replay(args.replay)} if args.replay else \
+        {name: WORKLOADS[name] for name in args.workloads}
+    results = []
+    try:
+        for size in args.sizes:
+            for name, workload in workloads.items():
+                preload(size)
+                calls = [c if len(c) == 4 else (*c, None) for c in workload(size, args.ops)]
+                routes = run(transport, calls, args.threads)
+                results.append({"size": size, "workload": name, "routes": routes})
+                for route, stats in routes.items():
+                    print(f"{size:>8} {name:>14} {route:<70} {stats['ops_per_sec']:>9.0f} ops/s "
+                          f"p50 {stats['p50_ms']:.3f} p95 {stats['p95_ms']:.3f} p99 {stats['p99_ms']:.3f} ms")
+    finally:
+        transport.close()
+
+    output = {
+        "meta": {"mode": args.mode, "threads": args.threads, "ops": args.ops,
+                 "python": platform.python_version(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("mode", "threads", "ops"):
+            if baseline["meta"].get(key) != output["meta"][key]:
+                print(f"aviso: la corrida base usó {key}={baseline['meta'].get(key)}")
+        regressions = compare(baseline, results)
+        for line in regressions:
+            print("REGRESIÓN:", line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# concurrency.py
+import threading
+from contextlib import contextmanager
+
+
+class IdAllocator:
+    def __init__(self, start=1):
+        self._lock = threading.Lock()
+        self._next = start
+
+    def next(self):
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
+
+    # Usado al reconstruir el estado: garantiza que no se repitan ids ya usados.
+    def skip_past(self, value):
+        with self._lock:
+            self._next = max(self._next, value + 1)
+
+
+class StripedLocks:
+    # Un número fijo de locks repartidos por hash de la clave: dos rides
+    # distintos casi nunca comparten lock y la memoria no crece con los rides.
+    def __init__(self, stripes=64):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def for_key(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def all(self):
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
@@ -0,0 +1,134 @@
+# metrics.py
+import cProfile
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+
+# Límites (en segundos) de los buckets del histograma de latencia.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+logger = logging.getLogger("rides.slow")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    # Histogramas de latencia y conteo de códigos de estado por ruta, más
+    # gauges que se evalúan al exponer /metrics (formato de texto de
+    # Prometheus). Con slow_ms, las solicitudes más lentas que ese umbral se
+    # registran en el log "rides.slow"; una fracción `sample` de ellas se
+    # perfila con cProfile.
+    def __init__(self, slow_ms=None, sample=0.01):
+        self.slowSeconds = None if slow_ms is None else slow_ms / 1000
+        self.sample = sample
+        self._lock = threading.Lock()
+        self._histograms = {}   # (method, route) -> [conteo por bucket..., +Inf, suma]
+        self._statuses = {}     # (method, route, status) -> conteo
+        self._gauges = []       # [({nombre: ayuda}, función que devuelve {nombre: valor})]
+
+    def init_app(self, app):
+        app.before_request(self._before)
+        app.after_request(self._after)
+        if self.slowSeconds is not None:
+            app.teardown_request(self._teardown)
+
+    def gauge(self, name, help_text, fn):
+        self._gauges.append(({name: help_text}, lambda: {name: fn()}))
+
+    # Varios gauges que salen de una misma consulta: fn() devuelve
+    # {nombre: valor} y se evalúa una sola vez por render().
+    def gauge_group(self, helps, fn):
+        self._gauges.append((helps, fn))
+
+    # Los hooks trabajan sobre el objeto Request real y no sobre los proxies
+    # de Flask (request, g): cada acceso a un proxy cuesta cerca de 1 µs.
+    # after_request también corre para los abort y para los 500 que Flask
+    # convierte en respuesta.
+    def _before(self):
+        req = request._get_current_object()
+        req.metricsProfile = None
+        if self.slowSeconds is not None and random.random() < self.sample:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                req.metricsProfile = profile
+            except ValueError:
+                pass  # ya hay otro profiler activo
+        req.metricsStart = time.perf_counter()
+
+    def _after(self, response):
+        req = request._get_current_object()
+        seconds = time.perf_counter() - req.metricsStart
+        rule = req.url_rule
+        self.observe(req.method, rule.rule if rule is not None else "unmatched",
+                     response.status_code, seconds, req)
+        return response
+
+    # Si la excepción se propaga (p. ej. en modo testing), after_request no
+    # corre: se detiene el profiler igualmente.
+    def _teardown(self, exc):
+        profile = getattr(request._get_current_object(), "metricsProfile", None)
+        if profile is not None:
+            profile.disable()
+
+    def observe(self, method, route, status, seconds, req=None):
+        key = (method, route)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(BUCKETS) + 2)
+            histogram[bisect_left(BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+            status_key = (method, route, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+        if req is not None and req.metricsProfile is not None:
+            req.metricsProfile.disable()
+        if self.slowSeconds is not None and seconds >= self.slowSeconds and req is not None:
+            self._log_slow(req, route, status, seconds)
+
+    def _log_slow(self, req, route, status, seconds):
+        profile = req.metricsProfile
+        req.metricsProfile = None
+        message = f"{req.method} {req.path} ({route}) -> {status} en {seconds * 1000:.1f} ms"
+        if profile is not None:
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(15)
+            message += "\n" + out.getvalue()
+        logger.warning(message)
+
+    def render(self):
+        lines = [
+            "# HELP http_request_duration_seconds Latencia de las solicitudes por ruta.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+            statuses = dict(self._statuses)
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), histogram[:-1]):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+        lines += [
+            "# HELP http_requests_total Solicitudes por ruta y código de estado.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{method="{_label(method)}",route="{_label(route)}",'
+                         f'status="{status}"}} {count}')
+        for helps, fn in self._gauges:
+            values = fn()
+            for name, help_text in helps.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {values[name]}"]
+        return "\n".join(lines) + "\n"
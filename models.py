@@ -1,16 +1,50 @@
 # models.py
+from concurrency import StripedLocks
+
+# Los estados se guardan como enteros pequeños; hacia afuera (JSON, logs)
+# siempre se expone el nombre.
+WAITING, CONFIRMED, REJECTED, MISSING, INPROGRESS, DONE, NOTMARKED, READY = range(8)
+STATUS_NAMES = ("waiting", "confirmed", "rejected", "missing", "inprogress", "done", "notmarked", "ready")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Máquina de estados de RideParticipation: estado actual -> estados permitidos.
+TRANSITIONS = {
+    WAITING: frozenset({CONFIRMED, REJECTED, MISSING}),
+    CONFIRMED: frozenset({INPROGRESS}),
+    INPROGRESS: frozenset({DONE, NOTMARKED}),
+}
+# Estados que ocupan espacios en el ride.
+ACTIVE_STATUSES = frozenset({WAITING, CONFIRMED, INPROGRESS})
+# Las estadísticas de un usuario cambian desde rides distintos (y por tanto
+# bajo locks de ride distintos), así que se protegen por alias.
+STATS_LOCKS = StripedLocks()
+# User.rides de los usuarios sin participaciones (vista vacía compartida).
+NO_RIDES = {}.keys()
 
 class RideParticipation:
+    __slots__ = ("participant", "destination", "occupiedSpaces", "statusCode", "confirmation")
+
     def __init__(self, participant, destination, occupiedSpaces):
         if participant is None:
             raise ValueError("Participant no puede ser None.")
-        self.participant = participant  
+        self.participant = participant
         self.destination = destination
         self.occupiedSpaces = occupiedSpaces
-        self.status = "waiting"   
-        self.confirmation = None      
+        self.statusCode = WAITING
+        self.confirmation = None
+
+    @property
+    def status(self):
+        return STATUS_NAMES[self.statusCode]
+
+    @status.setter
+    def status(self, name):
+        self.statusCode = STATUS_CODES[name]
 
 class Ride:
+    __slots__ = ("id", "rideDateAndTime", "finalAddress", "allowedSpaces", "rideDriver",
+                 "statusCode", "participants", "occupiedSpaces", "version")
+
     def __init__(self, id, rideDateAndTime, finalAddress, allowedSpaces, rideDriver):
         if allowedSpaces < 0:
             raise ValueError("allowedSpaces no puede ser negativo.")
@@ -18,24 +52,133 @@ class Ride:
         self.rideDateAndTime = rideDateAndTime
         self.finalAddress = finalAddress
         self.allowedSpaces = allowedSpaces
-        self.rideDriver = rideDriver  
-        self.status = "ready"           
-        self.participants = []          
+        self.rideDriver = rideDriver
+        self.statusCode = READY
+        self.participants = []
+        self.occupiedSpaces = 0
+        # Se incrementa con cada cambio del ride o de sus participaciones.
+        self.version = 0
+
+    @property
+    def status(self):
+        return STATUS_NAMES[self.statusCode]
+
+    @status.setter
+    def status(self, name):
+        self.statusCode = STATUS_CODES[name]
 
     def remainingSpaces(self):
-        return self.allowedSpaces - sum(
-            p.occupiedSpaces for p in self.participants if p.status in ["waiting", "confirmed", "inprogress"]
-        )
+        return self.allowedSpaces - self.occupiedSpaces
+
+    def addParticipant(self, rp):
+        self.participants.append(rp)
+        if rp.statusCode in ACTIVE_STATUSES:
+            self.occupiedSpaces += rp.occupiedSpaces
+        self.version += 1
+
+    # Único punto donde cambia el estado de una participación; mantiene
+    # actualizado el contador de espacios ocupados. Acepta el código o el
+    # nombre del estado. Un ride terminado ya no cambia (puede estar
+    # archivado).
+    def transition(self, rp, status):
+        self.checkNotDone()
+        code = STATUS_CODES[status] if isinstance(status, str) else status
+        if code not in TRANSITIONS.get(rp.statusCode, ()):
+            raise ValueError(f"Transición inválida: {rp.status} -> {STATUS_NAMES[code]}.")
+        if rp.statusCode in ACTIVE_STATUSES and code not in ACTIVE_STATUSES:
+            self.occupiedSpaces -= rp.occupiedSpaces
+        rp.statusCode = code
+        self.version += 1
+
+    def checkNotDone(self):
+        if self.statusCode == DONE:
+            raise ValueError(f"Ride {self.id} ya terminado.")
+
+    def accept(self, rp):
+        self.transition(rp, CONFIRMED)
+        rp.confirmation = True
+
+    def reject(self, rp):
+        self.transition(rp, REJECTED)
+        rp.confirmation = False
+        rp.participant.bump("previousRidesRejected")
+
+    def start(self):
+        self.checkNotDone()
+        for p in self.participants:
+            if p.statusCode == CONFIRMED:
+                self.transition(p, INPROGRESS)
+            elif p.statusCode == WAITING:
+                self.transition(p, MISSING)
+        self.statusCode = INPROGRESS
+        self.version += 1
+
+    def end(self):
+        self.checkNotDone()
+        for p in self.participants:
+            if p.statusCode == INPROGRESS:
+                self.transition(p, NOTMARKED)
+                p.participant.bump("previousRidesNotMarked", "previousRidesTotal")
+            elif p.statusCode == CONFIRMED:
+                p.participant.bump("previousRidesCompleted", "previousRidesTotal")
+            elif p.statusCode == MISSING:
+                p.participant.bump("previousRidesMissing", "previousRidesTotal")
+            else:
+                p.participant.bump("previousRidesTotal")
+        self.statusCode = DONE
+        self.version += 1
+
+    def unload(self, rp):
+        self.transition(rp, DONE)
+        rp.participant.bump("previousRidesCompleted", "previousRidesTotal")
+
 
 class User:
+    # Los cinco contadores van en slots propios: con enteros pequeños (que
+    # Python comparte) cuestan 8 bytes cada uno, menos que cualquier bloque
+    # contenedor aparte.
+    __slots__ = ("alias", "name", "carPlate", "_rides", "version",
+                 "previousRidesTotal", "previousRidesCompleted", "previousRidesMissing",
+                 "previousRidesNotMarked", "previousRidesRejected")
+
     def __init__(self, alias, name, carPlate=None):
         self.alias = alias
         self.name = name
         self.carPlate = carPlate
-        self.rides = []  
+        self._rides = None
 
         self.previousRidesTotal = 0
         self.previousRidesCompleted = 0
         self.previousRidesMissing = 0
         self.previousRidesNotMarked = 0
         self.previousRidesRejected = 0
+        # Sólo cambian las estadísticas; se incrementa con cada bump.
+        self.version = 0
+
+    # Participaciones en rides vivos; las de rides archivados se quitan. Se
+    # guardan como claves de un dict (ordenado) para quitarlas en O(1), y
+    # el dict se crea con la primera participación: en un dataset grande
+    # muchos usuarios nunca se unen a un ride. `rides` es una vista de sólo
+    # lectura, sin copiar; addRide y removeRide son la única forma de
+    # cambiarla (el store las llama al agregar y archivar participaciones).
+    @property
+    def rides(self):
+        return NO_RIDES if self._rides is None else self._rides.keys()
+
+    def addRide(self, rp):
+        if self._rides is None:
+            self._rides = {}
+        self._rides[rp] = None
+
+    def removeRide(self, rp):
+        if self._rides is not None:
+            self._rides.pop(rp, None)
+
+    def stats_lock(self):
+        return STATS_LOCKS.for_key(self.alias)
+
+    def bump(self, *counters):
+        with self.stats_lock():
+            for counter in counters:
+                setattr(self, counter, getattr(self, counter) + 1)
+            self.version += 1
@@ -0,0 +1,297 @@
+# persistence.py
+import json
+import os
+import threading
+
+from archive import RideArchive, ride_row
+from models import User, Ride, RideParticipation, DONE
+from store import MemoryStore
+
+SNAPSHOT_EVERY = 100000
+
+
+class EventLog:
+    # Log append-only en JSONL (una mutación por línea) con snapshots
+    # periódicos. Al arrancar se carga el último snapshot y sólo se
+    # reproduce la cola del log.
+    def __init__(self, directory, snapshot_every=SNAPSHOT_EVERY):
+        os.makedirs(directory, exist_ok=True)
+        self.logPath = os.path.join(directory, "events.jsonl")
+        # Log anterior a un snapshot en curso; se borra cuando el snapshot
+        # queda en disco.
+        self.oldLogPath = os.path.join(directory, "events.old.jsonl")
+        self.snapshotPath = os.path.join(directory, "snapshot.json")
+        self.snapshotEvery = snapshot_every
+        self._lock = threading.Lock()       # orden de escritura en el archivo
+        self._syncLock = threading.Lock()   # un solo fsync a la vez
+        self._file = None
+        self._seq = 0
+        self._durable = 0
+        self._sinceSnapshot = 0
+        self._validBytes = 0
+        self._snapshotThread = None
+
+    # Devuelve (estado del snapshot o None, eventos posteriores al snapshot).
+    def recover(self):
+        state = None
+        if os.path.exists(self.snapshotPath):
+            with open(self.snapshotPath, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            state = snapshot["state"]
+            self._seq = snapshot["seq"]
+        return state, self._read_tail()
+
+    # Si una caída interrumpió un snapshot, el log anterior se lee primero.
+    def _read_tail(self):
+        yield from self._read_events(self.oldLogPath)
+        self._validBytes = 0
+        yield from self._read_events(self.logPath)
+
+    def _read_events(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                # Una última línea incompleta (caída a mitad de escritura) se descarta.
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                self._validBytes += len(line)
+                if event["seq"] > self._seq:
+                    self._seq = event["seq"]
+                    self._sinceSnapshot += 1
+                    yield event
+
+    def open(self):
+        if os.path.exists(self.logPath):
+            with open(self.logPath, "r+b") as f:
+                f.truncate(self._validBytes)
+        self._file = open(self.logPath, "a", encoding="utf-8")
+        self._durable = self._seq
+
+    def close(self):
+        self.wait_snapshot()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    # Escribe el evento en el buffer y devuelve su número de secuencia. Debe
+    # llamarse dentro del mismo lock que la mutación que registra.
+    def write(self, event_type, **fields):
+        with self._lock:
+            self._seq += 1
+            self._sinceSnapshot += 1
+            fields["seq"] = self._seq
+            fields["type"] = event_type
+            self._file.write(json.dumps(fields, separators=(",", ":")) + "\n")
+            return self._seq
+
+    # Group commit: espera a que `seq` esté en disco. El hilo que hace el
+    # fsync persiste también todo lo escrito por los demás hasta ese momento,
+    # así que bajo carga un solo fsync cubre muchas escrituras.
+    def sync(self, seq):
+        if self._durable >= seq:
+            return
+        with self._syncLock:
+            if self._durable >= seq:
+                return
+            with self._lock:
+                self._file.flush()
+                target = self._seq
+                fd = self._file.fileno()
+            os.fsync(fd)
+            self._durable = max(self._durable, target)
+
+    def snapshot_due(self):
+        return self._sinceSnapshot >= self.snapshotEvery and self._snapshotThread is None
+
+    # Debe llamarse sin mutaciones en curso: `state` tiene que corresponder
+    # exactamente a los eventos escritos hasta ahora. Sólo rota el log; la
+    # serialización y el fsync del snapshot corren en otro hilo, así que las
+    # mutaciones se detienen apenas lo que tarda capturar el estado.
+    def start_snapshot(self, state):
+        seq = self._rotate()
+        self._snapshotThread = threading.Thread(target=self._write_snapshot, args=(seq, state),
+                                                name="snapshot", daemon=True)
+        self._snapshotThread.start()
+
+    def write_snapshot(self, state):
+        self.start_snapshot(state)
+        self.wait_snapshot()
+
+    def wait_snapshot(self):
+        thread = self._snapshotThread
+        if thread is not None:
+            thread.join()
+
+    # Los eventos hasta `seq` pasan al log anterior y se sigue escribiendo en
+    # uno nuevo. Toma también _syncLock: sync() hace fsync sobre el
+    # descriptor del archivo que aquí se cierra.
+    def _rotate(self):
+        with self._syncLock, self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            if os.path.exists(self.oldLogPath):
+                # Quedó de un snapshot fallido: sus eventos siguen haciendo falta.
+                with open(self.oldLogPath, "ab") as old, open(self.logPath, "rb") as current:
+                    old.write(current.read())
+                    old.flush()
+                    os.fsync(old.fileno())
+                os.remove(self.logPath)
+            else:
+                os.replace(self.logPath, self.oldLogPath)
+            self._file = open(self.logPath, "a", encoding="utf-8")
+            self._durable = self._seq
+            self._sinceSnapshot = 0
+            return self._seq
+
+    def _write_snapshot(self, seq, state):
+        try:
+            tmp = self.snapshotPath + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "state": state}, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshotPath)
+            # El snapshot cubre todo el log anterior: se compacta.
+            os.remove(self.oldLogPath)
+        finally:
+            self._snapshotThread = None
+
+
+# ------------------------
+# SNAPSHOTS
+# ------------------------
+STATS = ("previousRidesTotal", "previousRidesCompleted", "previousRidesMissing",
+         "previousRidesNotMarked", "previousRidesRejected")
+
+class ArchiveSweeper:
+    # Hilo que cada `interval` segundos archiva los rides terminados cuyo
+    # período de gracia venció, fuera del camino de las solicitudes. Los
+    # eventos "archived" se escriben bajo los locks del store (como toda
+    # mutación) y se sincronizan juntos al final de cada pasada.
+    def __init__(self, store, log, interval):
+        self.store = store
+        self.log = log
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        seqs = []
+        self.store.archive_due(lambda ride: seqs.append(self.log.write("archived", ride=ride.id)))
+        if seqs:
+            self.log.sync(seqs[-1])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="archive-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.run_once()
+
+
+def dump_store(store):
+    return {
+        "users": [
+            [u.alias, u.name, u.carPlate, u.version] + [getattr(u, s) for s in STATS]
+            for u in store.list_users()
+        ],
+        # Sólo el conjunto vivo: los rides archivados ya están en su archivo.
+        "rides": [ride_row(r) for r in store.rides.values()],
+    }
+
+def load_store(state):
+    store = MemoryStore()
+    for alias, name, carPlate, version, *stats in state["users"]:
+        user = store.add_user(User(alias, name, carPlate))
+        for counter, value in zip(STATS, stats):
+            setattr(user, counter, value)
+        user.version = version
+    for ride_id, dt, address, spaces, driver, status, version, participants in state["rides"]:
+        ride = Ride(ride_id, dt, address, spaces, store.find_user(driver))
+        ride.status = status
+        store.add_ride(ride)
+        store.rideIds.skip_past(ride_id)
+        for alias, destination, occupied, p_status, confirmation in participants:
+            rp = RideParticipation(store.find_user(alias), destination, occupied)
+            rp.status = p_status
+            rp.confirmation = confirmation
+            store.add_participation(ride, rp)
+        ride.version = version
+    return store
+
+
+# ------------------------
+# REPLAY
+# ------------------------
+def _user_created(store, e):
+    store.add_user(User(e["alias"], e["name"], e["carPlate"]))
+
+def _ride_created(store, e):
+    driver = store.find_user(e["driver"])
+    store.add_ride(Ride(e["ride"], e["rideDateAndTime"], e["finalAddress"], e["allowedSpaces"], driver))
+    store.rideIds.skip_past(e["ride"])
+
+def _joined(store, e):
+    rp = RideParticipation(store.find_user(e["alias"]), e["destination"], e["occupiedSpaces"])
+    store.add_participation(store.find_ride_by_id(e["ride"]), rp)
+
+def _participation_event(method):
+    def apply(store, e):
+        ride = store.find_ride_by_id(e["ride"])
+        getattr(ride, method)(store.find_participation(ride, e["alias"]))
+    return apply
+
+def _ride_event(method):
+    def apply(store, e):
+        getattr(store, method)(store.find_ride_by_id(e["ride"]))
+    return apply
+
+APPLY = {
+    "user_created": _user_created,
+    "ride_created": _ride_created,
+    "joined": _joined,
+    "accepted": _participation_event("accept"),
+    "rejected": _participation_event("reject"),
+    "started": _ride_event("start_ride"),
+    "ended": _ride_event("end_ride"),
+    "unloaded": _participation_event("unload"),
+    "archived": _ride_event("archive_ride"),
+}
+
+def apply_event(store, event):
+    APPLY[event["type"]](store, event)
+
+# Con archive_grace, los rides terminados pasan a archive.jsonl tras ese
+# número de segundos. Un archive.jsonl existente se abre siempre, aunque no
+# se archive más: el snapshot y el log ya no tienen esos rides, y sus ids
+# no deben reutilizarse.
+def open_store(directory, snapshot_every=SNAPSHOT_EVERY, archive_grace=None):
+    log = EventLog(directory, snapshot_every)
+    state, events = log.recover()
+    store = load_store(state) if state else MemoryStore()
+    archive_path = os.path.join(directory, "archive.jsonl")
+    if archive_grace is not None or os.path.exists(archive_path):
+        store.enable_archive(RideArchive(archive_path), archive_grace)
+    for event in events:
+        apply_event(store, event)
+    # Rides archivados justo antes de una caída, sin su evento "archived"
+    # (sólo pueden estar terminados).
+    if store.archive is not None:
+        for ride in [r for r in store.rides.values() if r.id in store.archive and r.statusCode == DONE]:
+            store.archive_ride(ride)
+    log.open()
+    return store, log
@@ -0,0 +1,85 @@
+# search.py
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return set(TOKEN_RE.findall(text))
+
+
+class RideIndex:
+    # Índices de los rides en estado "ready": una lista ordenada por
+    # rideDateAndTime (búsquedas por rango con bisect) y un índice invertido
+    # de tokens de finalAddress. Las fechas se comparan como texto, por lo
+    # que deben venir en formato "YYYY-MM-DD HH:MM".
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._byTime = []      # [(rideDateAndTime, ride id)] ordenado
+        self._byToken = {}     # token -> {ride id}
+        self._rides = {}       # ride id -> Ride
+
+    def __len__(self):
+        return len(self._rides)
+
+    # Lo que puede fallar (tokenizar, comparar la fecha) va antes de tocar
+    # los índices, así un ride inválido no queda indexado a medias.
+    def add(self, ride):
+        tokens = tokenize(ride.finalAddress)
+        with self._lock:
+            if ride.id in self._rides:
+                return
+            insort(self._byTime, (ride.rideDateAndTime, ride.id))
+            self._rides[ride.id] = ride
+            for token in tokens:
+                self._byToken.setdefault(token, set()).add(ride.id)
+
+    def remove(self, ride):
+        with self._lock:
+            if self._rides.pop(ride.id, None) is None:
+                return
+            key = (ride.rideDateAndTime, ride.id)
+            i = bisect_left(self._byTime, key)
+            if i < len(self._byTime) and self._byTime[i] == key:
+                del self._byTime[i]
+            for token in tokenize(ride.finalAddress):
+                ids = self._byToken.get(token)
+                if ids is not None:
+                    ids.discard(ride.id)
+                    if not ids:
+                        del self._byToken[token]
+
+    # Recorre la fuente de candidatos más pequeña: el rango de fechas o el
+    # token menos frecuente, así el costo depende del resultado y no del
+    # total de rides.
+    def search(self, start=None, end=None, keywords="", min_seats=0, limit=None):
+        tokens = tokenize(keywords)
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._byTime, (start,))
+            hi = len(self._byTime) if end is None else bisect_right(self._byTime, (end, float("inf")))
+            token_sets = sorted((self._byToken.get(t, set()) for t in tokens), key=len)
+            if token_sets and len(token_sets[0]) < hi - lo:
+                candidates = sorted(
+                    (self._rides[i].rideDateAndTime, i) for i in token_sets[0]
+                    if all(i in s for s in token_sets[1:])
+                    and (start is None or self._rides[i].rideDateAndTime >= start)
+                    and (end is None or self._rides[i].rideDateAndTime <= end)
+                )
+            else:
+                candidates = (
+                    self._byTime[i] for i in range(lo, hi)
+                    if all(self._byTime[i][1] in s for s in token_sets)
+                )
+            results = []
+            for _, ride_id in candidates:
+                ride = self._rides[ride_id]
+                if ride.remainingSpaces() >= min_seats:
+                    results.append(ride)
+                    if limit is not None and len(results) >= limit:
+                        break
+            return results
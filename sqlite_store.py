@@ -0,0 +1,342 @@
+# sqlite_store.py
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+
+from models import User, Ride, RideParticipation, READY
+from search import tokenize
+from store import StorageBackend, TRANSITION_METHODS
+
+# Varios procesos (workers de gunicorn) comparten el mismo archivo. En modo
+# WAL las lecturas no bloquean a las escrituras, y BEGIN IMMEDIATE toma el
+# lock de escritura al inicio de la transacción: leer, validar espacios y
+# escribir ocurre sin que otro proceso intercale cambios.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    alias TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    carPlate TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    previousRidesTotal INTEGER NOT NULL DEFAULT 0,
+    previousRidesCompleted INTEGER NOT NULL DEFAULT 0,
+    previousRidesMissing INTEGER NOT NULL DEFAULT 0,
+    previousRidesNotMarked INTEGER NOT NULL DEFAULT 0,
+    previousRidesRejected INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rides (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver TEXT NOT NULL REFERENCES users(alias),
+    rideDateAndTime TEXT NOT NULL,
+    finalAddress TEXT NOT NULL,
+    addressTokens TEXT NOT NULL,
+    allowedSpaces INTEGER NOT NULL,
+    occupiedSpaces INTEGER NOT NULL DEFAULT 0,
+    status INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS rides_by_driver ON rides (driver, id);
+CREATE INDEX IF NOT EXISTS rides_by_status_time ON rides (status, rideDateAndTime, id);
+CREATE TABLE IF NOT EXISTS participations (
+    ride INTEGER NOT NULL REFERENCES rides(id),
+    alias TEXT NOT NULL REFERENCES users(alias),
+    destination TEXT,
+    occupiedSpaces INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    confirmation INTEGER,
+    PRIMARY KEY (ride, alias)
+);
+"""
+
+STATS = ("previousRidesTotal", "previousRidesCompleted", "previousRidesMissing",
+         "previousRidesNotMarked", "previousRidesRejected")
+USER_COLUMNS = "u.alias, u.name, u.carPlate, u.version, " + ", ".join("u." + s for s in STATS)
+RIDE_COLUMNS = ("r.id, r.rideDateAndTime, r.finalAddress, r.allowedSpaces, r.status, "
+                "r.occupiedSpaces, r.version, " + USER_COLUMNS)
+
+# Las sentencias son constantes con parámetros: sqlite3 guarda en cada
+# conexión las ya preparadas (cached_statements) y las reutiliza.
+SELECT_USER = f"SELECT {USER_COLUMNS} FROM users u WHERE u.alias = ?"
+SELECT_USERS = f"SELECT {USER_COLUMNS} FROM users u ORDER BY u.seq LIMIT ? OFFSET ?"
+SELECT_RIDE = f"SELECT {RIDE_COLUMNS} FROM rides r JOIN users u ON u.alias = r.driver WHERE r.id = ?"
+SELECT_DRIVER_RIDE = SELECT_RIDE + " AND r.driver = ?"
+SELECT_DRIVER_RIDES = (f"SELECT {RIDE_COLUMNS} FROM rides r JOIN users u ON u.alias = r.driver "
+                       "WHERE r.driver = ? ORDER BY r.id LIMIT ? OFFSET ?")
+SELECT_PARTICIPATIONS = (f"SELECT p.destination, p.occupiedSpaces, p.status, p.confirmation, {USER_COLUMNS} "
+                         "FROM participations p JOIN users u ON u.alias = p.alias "
+                         "WHERE p.ride = ? ORDER BY p.rowid")
+INSERT_USER = ("INSERT OR IGNORE INTO users (alias, name, carPlate, version, " + ", ".join(STATS) + ") "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_RIDE = ("INSERT INTO rides (id, driver, rideDateAndTime, finalAddress, addressTokens, "
+               "allowedSpaces, occupiedSpaces, status, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_PARTICIPATION = ("INSERT INTO participations (ride, alias, destination, occupiedSpaces, status, "
+                        "confirmation) VALUES (?, ?, ?, ?, ?, ?)")
+UPDATE_RIDE = "UPDATE rides SET status = ?, occupiedSpaces = ?, version = ? WHERE id = ?"
+UPDATE_PARTICIPATION = "UPDATE participations SET status = ?, confirmation = ? WHERE ride = ? AND alias = ?"
+COUNTS = ("SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM rides), "
+          "(SELECT COUNT(*) FROM participations), (SELECT COUNT(*) FROM rides WHERE status = ?)")
+UPDATE_STATS = "UPDATE users SET version = ?, " + ", ".join(s + " = ?" for s in STATS) + " WHERE alias = ?"
+
+
+def _user(row):
+    user = User(row[0], row[1], row[2])
+    user.version = row[3]
+    for counter, value in zip(STATS, row[4:]):
+        setattr(user, counter, value)
+    return user
+
+def _ride(row):
+    ride = Ride(row[0], row[1], row[2], row[3], _user(row[7:]))
+    ride.statusCode = row[4]
+    ride.occupiedSpaces = row[5]
+    ride.version = row[6]
+    return ride
+
+# Los tokens se guardan separados por espacios y con espacios en los bordes,
+# así "LIKE '% token %'" busca palabras completas.
+def _tokens(text):
+    return " " + " ".join(sorted(tokenize(text))) + " "
+
+
+class _Rows:
+    # Secuencia perezosa sobre una consulta: len() y slicing con
+    # LIMIT/OFFSET, que es todo lo que usa la paginación.
+    def __init__(self, store, count_sql, select_sql, params, build):
+        self._store = store
+        self._countSql = count_sql
+        self._selectSql = select_sql
+        self._params = params
+        self._build = build
+
+    def __len__(self):
+        with self._store._connection() as conn:
+            return conn.execute(self._countSql, self._params).fetchone()[0]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("Sólo se admiten slices contiguos.")
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(0, index.stop - start)
+        with self._store._read() as conn:
+            rows = conn.execute(self._selectSql, self._params + (limit, start)).fetchall()
+        return [self._build(row) for row in rows]
+
+
+class SqliteStore(StorageBackend):
+    # Los objetos devueltos son copias materializadas de las filas: cada
+    # operación que los modifica escribe de vuelta las filas afectadas.
+    def __init__(self, path, pool_size=8, busy_timeout_ms=10000):
+        self.path = path
+        self.busyTimeout = busy_timeout_ms
+        self._pool = queue.LifoQueue(pool_size)
+        self._local = threading.local()   # conexión de la transacción en curso
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                               cached_statements=256, timeout=self.busyTimeout / 1000)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.busyTimeout}")
+        return conn
+
+    # Dentro de una transacción se reutiliza su conexión; fuera, se toma una
+    # del pool (o se abre una nueva) y se devuelve al terminar.
+    @contextmanager
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, "conn", None) is not None:
+            yield
+            return
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.conn = conn
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._local.conn = None
+
+    # Lecturas de varias sentencias dentro de una misma transacción: todas
+    # ven la misma versión de la base (en modo autocommit cada SELECT vería
+    # su propio snapshot del WAL y el ride podría mezclar dos versiones).
+    @contextmanager
+    def _read(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+
+    # El ride se vuelve a leer ya con el lock de escritura tomado: lo que
+    # valida el endpoint es lo que hay en la base, no lo que leyó antes.
+    @contextmanager
+    def ride_transaction(self, ride):
+        with self.transaction():
+            yield self.find_ride_by_id(ride.id)
+
+    # Cada lectura materializa una copia propia: no hay nada que proteger.
+    def ride_lock(self, ride_id):
+        return nullcontext()
+
+    # USUARIOS
+    def find_user(self, alias):
+        with self._connection() as conn:
+            row = conn.execute(SELECT_USER, (alias,)).fetchone()
+        return _user(row) if row else None
+
+    def add_user(self, user, on_add=None):
+        with self._connection() as conn:
+            cursor = conn.execute(INSERT_USER, (user.alias, user.name, user.carPlate, user.version,
+                                                *(getattr(user, s) for s in STATS)))
+            if not cursor.rowcount:
+                return None
+            if on_add is not None:
+                on_add(user)
+        return user
+
+    def list_users(self):
+        return _Rows(self, "SELECT COUNT(*) FROM users", SELECT_USERS, (), _user)
+
+    # RIDES
+    def add_ride(self, ride, on_add=None):
+        with self._connection() as conn:
+            cursor = conn.execute(INSERT_RIDE, (
+                ride.id, ride.rideDriver.alias, ride.rideDateAndTime, ride.finalAddress,
+                _tokens(ride.finalAddress), ride.allowedSpaces, ride.occupiedSpaces,
+                ride.statusCode, ride.version))
+            ride.id = cursor.lastrowid
+            if on_add is not None:
+                on_add(ride)
+        return ride
+
+    def _load(self, sql, params):
+        with self._read() as conn:
+            row = conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            ride = _ride(row)
+            participants = conn.execute(SELECT_PARTICIPATIONS, (ride.id,)).fetchall()
+        users = {ride.rideDriver.alias: ride.rideDriver}
+        for row in participants:
+            user = users.setdefault(row[4], _user(row[4:]))
+            rp = RideParticipation(user, row[0], row[1])
+            rp.statusCode = row[2]
+            rp.confirmation = None if row[3] is None else bool(row[3])
+            ride.participants.append(rp)
+        return ride
+
+    def find_ride(self, driver_alias, ride_id):
+        return self._load(SELECT_DRIVER_RIDE, (ride_id, driver_alias))
+
+    def find_ride_by_id(self, ride_id):
+        return self._load(SELECT_RIDE, (ride_id,))
+
+    # Para listar sólo hacen falta los campos del ride, no los participantes.
+    def rides_of(self, driver_alias):
+        return _Rows(self, "SELECT COUNT(*) FROM rides WHERE driver = ?", SELECT_DRIVER_RIDES,
+                     (driver_alias,), _ride)
+
+    def start_ride(self, ride):
+        with self.transaction():
+            ride.start()
+            self._save(ride, ride.participants)
+
+    def end_ride(self, ride):
+        with self.transaction():
+            ride.end()
+            self._save(ride, ride.participants)
+
+    def search_rides(self, start=None, end=None, keywords="", min_seats=0, limit=None):
+        sql = [f"SELECT {RIDE_COLUMNS} FROM rides r JOIN users u ON u.alias = r.driver "
+               "WHERE r.status = ? AND r.allowedSpaces - r.occupiedSpaces >= ?"]
+        params = [READY, min_seats]
+        if start is not None:
+            sql.append("AND r.rideDateAndTime >= ?")
+            params.append(start)
+        if end is not None:
+            sql.append("AND r.rideDateAndTime <= ?")
+            params.append(end)
+        for token in sorted(tokenize(keywords)):
+            sql.append("AND r.addressTokens LIKE ?")
+            params.append(f"% {token} %")
+        sql.append("ORDER BY r.rideDateAndTime, r.id LIMIT ?")
+        params.append(-1 if limit is None else limit)
+        with self._connection() as conn:
+            rows = conn.execute(" ".join(sql), params).fetchall()
+        return [_ride(row) for row in rows]
+
+    # PARTICIPANTES
+    def find_participation(self, ride, participant_alias):
+        for rp in ride.participants:
+            if rp.participant.alias == participant_alias:
+                return rp
+        return None
+
+    def add_participation(self, ride, rp):
+        with self.transaction():
+            self._local.conn.execute(INSERT_PARTICIPATION, (
+                ride.id, rp.participant.alias, rp.destination, rp.occupiedSpaces,
+                rp.statusCode, rp.confirmation))
+            ride.addParticipant(rp)
+            self._save(ride, ())
+        return rp
+
+    def transition(self, ride, rp, status):
+        with self.transaction():
+            getattr(ride, TRANSITION_METHODS[status])(rp)
+            self._save(ride, (rp,))
+
+    # Escribe el estado del ride, de las participaciones dadas y de las
+    # estadísticas de sus participantes. Se llama dentro de la transacción.
+    def _save(self, ride, participations):
+        conn = self._local.conn
+        conn.execute(UPDATE_RIDE, (ride.statusCode, ride.occupiedSpaces, ride.version, ride.id))
+        conn.executemany(UPDATE_PARTICIPATION, [
+            (rp.statusCode, rp.confirmation, ride.id, rp.participant.alias) for rp in participations
+        ])
+        conn.executemany(UPDATE_STATS, [
+            (u.version, *(getattr(u, s) for s in STATS), u.alias)
+            for u in {rp.participant.alias: rp.participant for rp in participations}.values()
+        ])
+
+    def counts(self):
+        with self._connection() as conn:
+            users, rides, participations, searchable = conn.execute(COUNTS, (READY,)).fetchone()
+        return {"users": users, "rides": rides, "participations": participations,
+                "searchable": searchable, "archived": 0}
@@ -0,0 +1,368 @@
+# store.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+from concurrency import IdAllocator, StripedLocks
+from models import READY, DONE
+from search import RideIndex
+
+
+class StorageBackend(ABC):
+    # Operaciones que necesitan los endpoints. Los objetos devueltos son
+    # modelos de models.py; toda mutación pasa por el backend para que pueda
+    # persistirla. Un backend al que le falte alguna falla al construirse.
+
+    # Contexto para altas de usuarios y rides (chequeo de duplicados atómico).
+    @abstractmethod
+    def transaction(self):
+        ...
+
+    # Contexto de lectura-y-escritura sobre un ride: devuelve el ride
+    # actualizado y garantiza que nadie más lo modifica hasta salir.
+    @abstractmethod
+    def ride_transaction(self, ride):
+        ...
+
+    # Lock para lecturas consistentes de un ride (sin escribir).
+    @abstractmethod
+    def ride_lock(self, ride_id):
+        ...
+
+    # USUARIOS
+    @abstractmethod
+    def find_user(self, alias):
+        ...
+
+    # Devuelve None si el alias ya existe. on_add(user) se llama dentro de
+    # la transacción, antes de que el usuario sea visible para otras
+    # solicitudes (ahí se registra su evento de alta).
+    @abstractmethod
+    def add_user(self, user, on_add=None):
+        ...
+
+    # Secuencia con len() y slicing en orden estable de inserción.
+    @abstractmethod
+    def list_users(self):
+        ...
+
+    # RIDES
+    # Asigna el id si ride.id es None. on_add(ride) como en add_user, ya con
+    # el id asignado.
+    @abstractmethod
+    def add_ride(self, ride, on_add=None):
+        ...
+
+    @abstractmethod
+    def find_ride(self, driver_alias, ride_id):
+        ...
+
+    @abstractmethod
+    def find_ride_by_id(self, ride_id):
+        ...
+
+    # Secuencia con len() y slicing, ordenada por id.
+    @abstractmethod
+    def rides_of(self, driver_alias):
+        ...
+
+    @abstractmethod
+    def start_ride(self, ride):
+        ...
+
+    @abstractmethod
+    def end_ride(self, ride):
+        ...
+
+    @abstractmethod
+    def search_rides(self, start=None, end=None, keywords="", min_seats=0, limit=None):
+        ...
+
+    # PARTICIPANTES
+    @abstractmethod
+    def find_participation(self, ride, participant_alias):
+        ...
+
+    @abstractmethod
+    def add_participation(self, ride, rp):
+        ...
+
+    # status: "confirmed", "rejected" o "done". Las transiciones inválidas
+    # lanzan ValueError (ver models.TRANSITIONS).
+    @abstractmethod
+    def transition(self, ride, rp, status):
+        ...
+
+    # Tamaños para las métricas: users, rides, participations, searchable,
+    # archived.
+    @abstractmethod
+    def counts(self):
+        ...
+
+    # Mueve al archivo los rides terminados cuyo período de gracia venció y
+    # llama a on_archive(ride) por cada uno. Los backends sin archivo no
+    # hacen nada.
+    def archive_due(self, on_archive=None):
+        pass
+
+
+# Operación de Ride para cada estado destino de transition().
+TRANSITION_METHODS = {"confirmed": "accept", "rejected": "reject", "done": "unload"}
+
+
+class MemoryStore(StorageBackend):
+    def __init__(self, stripes=64):
+        # Índices hash: todas las búsquedas de los endpoints son O(1).
+        self.users = {}                # alias -> User
+        self.userOrder = []            # [User] en orden de inserción (para paginar)
+        self.rides = {}                # ride id -> Ride
+        self.ridesByDriverAndId = {}   # (driver alias, ride id) -> Ride
+        self.rideIdsByDriver = {}      # driver alias -> array("q") de ids, vivos y archivados
+        self.participants = {}         # ride id -> {participant alias: RideParticipation}
+        self.rideIndex = RideIndex()   # rides "ready" por fecha y destino
+        self.rideIds = IdAllocator()
+        self.rideLocks = StripedLocks(stripes)
+        # Protege la estructura de los índices (altas de usuarios y rides).
+        self.lock = threading.RLock()
+        # Archivo de rides terminados (ver enable_archive).
+        self.archive = None
+        self.archiveGrace = None        # None: se lee el archivo, pero no se archiva
+        self.doneQueue = deque()        # [(instante de fin, ride id)]
+        self._droppedSinceCompact = 0
+
+    def transaction(self):
+        return self.lock
+
+    @contextmanager
+    def ride_transaction(self, ride):
+        with self.rideLocks.for_key(ride.id):
+            yield ride
+
+    # Lock por ride: toda lectura-y-escritura sobre un ride y sus
+    # participantes debe hacerse dentro de este lock.
+    def ride_lock(self, ride_id):
+        return self.rideLocks.for_key(ride_id)
+
+    # USUARIOS
+    def find_user(self, alias):
+        return self.users.get(alias)
+
+    # Devuelve None si el alias ya existe (chequeo e inserción atómicos).
+    # El evento de alta se escribe antes de publicar el usuario: un "joined"
+    # concurrente no puede quedar antes que él en el log.
+    def add_user(self, user, on_add=None):
+        with self.lock:
+            if user.alias in self.users:
+                return None
+            if on_add is not None:
+                on_add(user)
+            self.users[user.alias] = user
+            self.userOrder.append(user)
+        return user
+
+    # Listas append-only: una posición identifica siempre al mismo elemento,
+    # lo que permite paginar con cursores estables.
+    def list_users(self):
+        return self.userOrder
+
+    # RIDES
+    def next_ride_id(self):
+        return self.rideIds.next()
+
+    def add_ride(self, ride, on_add=None):
+        driver_alias = ride.rideDriver.alias
+        with self.lock:
+            # Dentro del lock, para que rideIdsByDriver quede ordenado por id.
+            if ride.id is None:
+                ride.id = self.next_ride_id()
+            # El índice de búsqueda va primero: si falla, el ride no queda a
+            # medias en los demás índices ni con su evento registrado.
+            if ride.statusCode == READY:
+                self.rideIndex.add(ride)
+            if on_add is not None:
+                try:
+                    on_add(ride)
+                except BaseException:
+                    self.rideIndex.remove(ride)
+                    raise
+            self.participants[ride.id] = {}
+            self.rides[ride.id] = ride
+            self.ridesByDriverAndId[(driver_alias, ride.id)] = ride
+            self._index_driver_ride(driver_alias, ride.id)
+        return ride
+
+    # Un ride deja de ser buscable en cuanto inicia o termina.
+    def start_ride(self, ride):
+        ride.start()
+        self.rideIndex.remove(ride)
+
+    def end_ride(self, ride):
+        ride.end()
+        self.rideIndex.remove(ride)
+        if self.archiveGrace is not None:
+            self.doneQueue.append((time.monotonic(), ride.id))
+
+    def search_rides(self, start=None, end=None, keywords="", min_seats=0, limit=None):
+        return self.rideIndex.search(start, end, keywords, min_seats, limit)
+
+    # Los rides archivados se leen del archivo. Al archivar, el ride se
+    # indexa allí antes de quitarlo del conjunto vivo: siempre está en uno.
+    def find_ride(self, driver_alias, ride_id):
+        ride = self.ridesByDriverAndId.get((driver_alias, ride_id))
+        if ride is None and self.archive is not None:
+            ride = self.archive.get(ride_id, self.find_user)
+            if ride is not None and ride.rideDriver.alias != driver_alias:
+                return None
+        return ride
+
+    def find_ride_by_id(self, ride_id):
+        ride = self.rides.get(ride_id)
+        if ride is None and self.archive is not None:
+            ride = self.archive.get(ride_id, self.find_user)
+        return ride
+
+    def rides_of(self, driver_alias):
+        return DriverRides(self, driver_alias)
+
+    # Los ids llegan en orden salvo al recuperar (rides del archivo y del
+    # log mezclados); un id repetido se ignora.
+    def _index_driver_ride(self, driver_alias, ride_id):
+        ids = self.rideIdsByDriver.get(driver_alias)
+        if ids is None:
+            ids = self.rideIdsByDriver[driver_alias] = array("q")
+        if not ids or ids[-1] < ride_id:
+            ids.append(ride_id)
+        else:
+            i = bisect_left(ids, ride_id)
+            if i == len(ids) or ids[i] != ride_id:
+                ids.insert(i, ride_id)
+
+    # PARTICIPANTES
+    def find_participation(self, ride, participant_alias):
+        participants = self.participants.get(ride.id)
+        if participants is None:  # ride archivado
+            return next((p for p in ride.participants if p.participant.alias == participant_alias), None)
+        return participants.get(participant_alias)
+
+    def add_participation(self, ride, rp):
+        self.participants[ride.id][rp.participant.alias] = rp
+        ride.addParticipant(rp)
+        rp.participant.addRide(rp)
+        return rp
+
+    def transition(self, ride, rp, status):
+        getattr(ride, TRANSITION_METHODS[status])(rp)
+
+    def counts(self):
+        return {
+            "users": len(self.users),
+            "rides": len(self.rides),
+            "participations": sum(len(p) for p in list(self.participants.values())),
+            "searchable": len(self.rideIndex),
+            "archived": 0 if self.archive is None else len(self.archive),
+        }
+
+    # ARCHIVO
+    # Los rides terminados pasan a `archive` (archive.RideArchive) tras
+    # `grace_seconds`, en cada llamada a archive_due (ver
+    # persistence.ArchiveSweeper); de ellos sólo quedan en memoria su
+    # offset en el archivo y su id en la lista del conductor. Con
+    # grace_seconds None los ya archivados se siguen leyendo (y sus ids no
+    # se reutilizan), pero no se archivan más.
+    def enable_archive(self, archive, grace_seconds=None):
+        self.archive = archive
+        self.archiveGrace = grace_seconds
+        self.rideIds.skip_past(archive.max_id())
+        now = time.monotonic()
+        with self.lock:
+            for ride_id, driver_alias in archive.recovered:
+                self._index_driver_ride(driver_alias, ride_id)
+            archive.recovered = []
+            if grace_seconds is not None:
+                self.doneQueue.extend((now, r.id) for r in self.rides.values() if r.statusCode == DONE)
+
+    def archive_due(self, on_archive=None):
+        if self.archiveGrace is None or not self.doneQueue:
+            return
+        limit = time.monotonic() - self.archiveGrace
+        if self.doneQueue[0][0] > limit:
+            return
+        due = []
+        with self.lock:
+            while self.doneQueue and self.doneQueue[0][0] <= limit:
+                due.append(self.doneQueue.popleft()[1])
+        # Las filas se escriben bajo el lock de cada ride y se sincronizan
+        # todas juntas, antes de que un evento "archived" pueda llegar a
+        # disco. Un ride terminado rechaza cambios, pero si su versión no es
+        # la escrita al quitarlo de memoria, se escribe de nuevo.
+        pending = []
+        for ride_id in due:
+            with self.rideLocks.for_key(ride_id):
+                ride = self.rides.get(ride_id)
+                if ride is not None and ride_id not in self.archive:
+                    pending.append((ride, ride.version, self.archive.write(ride)))
+        self.archive.sync()
+        for ride, version, offset in pending:
+            with self.rideLocks.for_key(ride.id), self.lock:
+                if ride.version != version:
+                    offset = self.archive.write(ride)
+                    self.archive.sync()
+                self.archive.add(ride, offset)
+                self._drop(ride)
+                if on_archive is not None:
+                    on_archive(ride)
+
+    # Archiva un ride de inmediato (replay). Si ya estaba en el archivo, por
+    # una caída antes de registrar el evento, sólo lo quita de memoria.
+    def archive_ride(self, ride):
+        if ride.id not in self.archive:
+            offset = self.archive.write(ride)
+            self.archive.sync()
+            self.archive.add(ride, offset)
+        with self.lock:
+            self._drop(ride)
+
+    def _drop(self, ride):
+        driver_alias = ride.rideDriver.alias
+        del self.rides[ride.id]
+        del self.ridesByDriverAndId[(driver_alias, ride.id)]
+        for rp in self.participants.pop(ride.id).values():
+            rp.participant.removeRide(rp)
+        self.rideIndex.remove(ride)
+        # Los dicts no se achican al borrar: cuando se archivaron más rides
+        # de los que quedan vivos, se copian para liberar su tabla.
+        self._droppedSinceCompact += 1
+        if self._droppedSinceCompact > len(self.rides):
+            self.rides = dict(self.rides)
+            self.ridesByDriverAndId = dict(self.ridesByDriverAndId)
+            self.participants = dict(self.participants)
+            self._droppedSinceCompact = 0
+
+
+class DriverRides:
+    # Rides de un conductor ordenados por id, vivos y archivados. Un ride
+    # conserva su posición al archivarse, así que los cursores de
+    # paginación siguen siendo válidos. Los archivados se leen sólo si caen
+    # en el slice pedido. Al archivar, el ride se indexa en el archivo antes
+    # de salir de store.rides, así que siempre se encuentra en uno de los dos.
+    def __init__(self, store, driver_alias):
+        self._store = store
+        self._alias = driver_alias
+
+    def _ids(self):
+        return self._store.rideIdsByDriver.get(self._alias, ())
+
+    def __len__(self):
+        return len(self._ids())
+
+    def __getitem__(self, index):
+        store = self._store
+        with store.lock:
+            ids = self._ids()[index]
+        if not isinstance(index, slice):
+            return store.find_ride_by_id(ids)
+        return [store.find_ride_by_id(ride_id) for ride_id in ids]
@@ -44,13 +44,86 @@ class TestModels(unittest.TestCase):
         rp1 = RideParticipation(p1, "Destino 1", 1)
         rp2 = RideParticipation(p2, "Destino 2", 2)
 
-        rp1.status = "confirmed"
-        rp2.status = "waiting"
-
-        ride.participants.extend([rp1, rp2])
+        ride.addParticipant(rp1)
+        ride.addParticipant(rp2)
+        ride.accept(rp1)
 
+        self.assertEqual(rp1.status, "confirmed")
+        self.assertEqual(rp2.status, "waiting")
         self.assertEqual(ride.remainingSpaces(), 1)  # 4 - (1 + 2)
 
+    #  Rechazar una solicitud libera sus espacios
+    def test_reject_frees_spaces(self):
+        p1 = User("p1", "Ana")
+        ride = Ride(1, "2025-07-17 12:00", "UTEC", 4, User("conductor", "Pedro"))
+        rp1 = RideParticipation(p1, "Destino 1", 3)
+        ride.addParticipant(rp1)
+        self.assertEqual(ride.remainingSpaces(), 1)
+
+        ride.reject(rp1)
+
+        self.assertEqual(ride.remainingSpaces(), 4)
+        self.assertEqual(p1.previousRidesRejected, 1)
+
+    #  Error: transición de estado no permitida
+    def test_invalid_transition(self):
+        ride = Ride(1, "2025-07-17 12:00", "UTEC", 4, User("conductor", "Pedro"))
+        rp = RideParticipation(User("p1", "Ana"), "Destino 1", 1)
+        ride.addParticipant(rp)
+        with self.assertRaises(ValueError):
+            ride.unload(rp)  # waiting -> done
+        ride.reject(rp)
+        with self.assertRaises(ValueError):
+            ride.accept(rp)  # rejected -> confirmed
+        self.assertEqual(rp.status, "rejected")
+
+    #  Error: un ride terminado ya no acepta transiciones
+    def test_transition_on_done_ride(self):
+        p1 = User("p1", "Ana")
+        ride = Ride(1, "2025-07-17 12:00", "UTEC", 4, User("conductor", "Pedro"))
+        rp = RideParticipation(p1, "Destino 1", 1)
+        ride.addParticipant(rp)
+        ride.end()
+        with self.assertRaises(ValueError):
+            ride.reject(rp)
+        with self.assertRaises(ValueError):
+            ride.end()
+        self.assertEqual(rp.status, "waiting")
+        self.assertEqual(p1.previousRidesRejected, 0)
+
+    #  El ciclo completo deja los espacios libres y las estadísticas al día
+    def test_full_ride_cycle(self):
+        ride = Ride(1, "2025-07-17 12:00", "UTEC", 4, User("conductor", "Pedro"))
+        p1, p2 = User("p1", "Ana"), User("p2", "Luis")
+        rp1 = RideParticipation(p1, "Destino 1", 1)
+        rp2 = RideParticipation(p2, "Destino 2", 2)
+        ride.addParticipant(rp1)
+        ride.addParticipant(rp2)
+        ride.accept(rp1)
+        ride.accept(rp2)
+        ride.start()
+        ride.unload(rp1)
+        self.assertEqual(ride.remainingSpaces(), 2)
+        ride.end()
+
+        self.assertEqual((rp1.status, rp2.status), ("done", "notmarked"))
+        self.assertEqual(ride.remainingSpaces(), 4)
+        self.assertEqual(p2.previousRidesNotMarked, 1)
+        self.assertEqual(p1.previousRidesCompleted, 1)
+
+    #  Modelos compactos: sin __dict__ y el estado se expone por nombre
+    def test_compact_models(self):
+        user = User("p1", "Ana")
+        ride = Ride(1, "2025-07-17 12:00", "UTEC", 4, User("conductor", "Pedro"))
+        rp = RideParticipation(user, "Destino 1", 1)
+        for obj in (user, ride, rp):
+            self.assertFalse(hasattr(obj, "__dict__"))
+        ride.addParticipant(rp)
+        ride.accept(rp)
+        self.assertEqual((ride.status, rp.status), ("ready", "confirmed"))
+        self.assertEqual(list(user.rides), [])
+
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,174 @@
+# tests/test_archive.py
+
+import os
+import tempfile
+import time
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from persistence import ArchiveSweeper, dump_store, open_store
+from store import MemoryStore
+
+class TestRideArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.open()
+        self.client = app_module.app.test_client()
+        c = self.client
+        c.post("/usuarios", json={"alias": "conductor", "name": "Pedro", "carPlate": "ABC123"})
+        for alias in ("ana", "luis"):
+            c.post("/usuarios", json={"alias": alias, "name": alias.title()})
+        for i in range(3):
+            c.post("/usuarios/conductor/rides", json={
+                "finalAddress": "UTEC", "rideDateAndTime": f"2025-07-1{i} 22:00", "allowedSpaces": 4
+            })
+
+    def tearDown(self):
+        app_module.event_log.close()
+        if app_module.store.archive is not None:
+            app_module.store.archive.close()
+        app_module.store, app_module.event_log = MemoryStore(), None
+        self.tmp.cleanup()
+
+    def open(self, archive_grace=0):
+        app_module.store, app_module.event_log = open_store(self.tmp.name, 1000, archive_grace=archive_grace)
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.sweeper = ArchiveSweeper(app_module.store, app_module.event_log, 1)
+
+    def restart(self, archive_grace=0):
+        app_module.event_log.close()
+        if app_module.store.archive is not None:
+            app_module.store.archive.close()
+        self.open(archive_grace)
+
+    def finish_ride(self, ride_id):
+        c = self.client
+        c.post(f"/usuarios/conductor/rides/{ride_id}/requestToJoin/ana", json={
+            "destination": "Barranco", "occupiedSpaces": 1
+        })
+        c.post(f"/usuarios/conductor/rides/{ride_id}/accept/ana")
+        c.post(f"/usuarios/conductor/rides/{ride_id}/start")
+        response = c.post(f"/usuarios/conductor/rides/{ride_id}/end")
+        self.sweeper.run_once()
+        return response
+
+    # ✅ Éxito: el ride terminado sale de memoria y se sigue leyendo igual
+    def test_done_ride_is_archived(self):
+        self.finish_ride(2)
+        store = app_module.store
+        self.assertNotIn(2, store.rides)
+        self.assertEqual(len(store.archive), 1)
+        self.assertEqual(list(store.find_user("ana").rides), [])
+
+        details = self.client.get("/usuarios/conductor/rides/2").get_json()["ride"]
+        self.assertEqual(details["status"], "done")
+        self.assertEqual([p["participant"]["alias"] for p in details["participants"]], ["ana"])
+        self.assertEqual(details["participants"][0]["participant"]["previousRidesTotal"], 1)
+        self.assertEqual(self.client.get("/usuarios/luis/rides/2").status_code, 404)
+
+    #  La lista del conductor mezcla vivos y archivados sin mover los cursores
+    def test_user_rides_include_archived(self):
+        page = self.client.get("/usuarios/conductor/rides?limit=2")
+        self.finish_ride(1)
+        self.finish_ride(2)
+        rest = self.client.get(f"/usuarios/conductor/rides?after={page.headers['X-Next-Cursor']}")
+        self.assertEqual([r["id"] for r in rest.get_json()], [3])
+        rides = self.client.get("/usuarios/conductor/rides").get_json()
+        self.assertEqual([(r["id"], r["status"]) for r in rides],
+                         [(1, "done"), (2, "done"), (3, "ready")])
+
+    #  Error: un ride terminado no se puede volver a terminar
+    def test_archived_ride_is_immutable(self):
+        self.finish_ride(1)
+        self.assertEqual(self.client.post("/usuarios/conductor/rides/1/end").status_code, 422)
+        self.assertEqual(self.client.post("/usuarios/conductor/rides/1/accept/ana").status_code, 422)
+        self.assertEqual(app_module.store.find_user("ana").previousRidesTotal, 1)
+
+    #  Error: un participante que quedó en espera no se puede aceptar ni
+    # rechazar después de archivar el ride
+    def test_waiting_participant_of_archived_ride(self):
+        c = self.client
+        c.post("/usuarios/conductor/rides/1/requestToJoin/luis", json={
+            "destination": "Barranco", "occupiedSpaces": 1
+        })
+        c.post("/usuarios/conductor/rides/1/end")
+        self.sweeper.run_once()
+        self.assertNotIn(1, app_module.store.rides)
+        for _ in range(3):
+            self.assertEqual(c.post("/usuarios/conductor/rides/1/reject/luis").status_code, 422)
+            self.assertEqual(c.post("/usuarios/conductor/rides/1/accept/luis").status_code, 422)
+        self.assertEqual(app_module.store.find_user("luis").previousRidesRejected, 0)
+        participant = c.get("/usuarios/conductor/rides/1").get_json()["ride"]["participants"][0]
+        self.assertEqual(participant["status"], "waiting")
+        self.assertIsNone(participant["confirmation"])
+
+    #  El ride se archiva en una pasada del hilo, no al responder
+    def test_sweeper_thread_archives(self):
+        c = self.client
+        c.post("/usuarios/conductor/rides/1/end")
+        self.assertIn(1, app_module.store.rides)
+        self.sweeper.interval = 0.01
+        self.sweeper.start()
+        try:
+            for _ in range(500):
+                if 1 not in app_module.store.rides:
+                    break
+                time.sleep(0.01)
+        finally:
+            self.sweeper.stop()
+        self.assertNotIn(1, app_module.store.rides)
+        self.restart()
+        self.assertNotIn(1, app_module.store.rides)
+
+    #  Tras reiniciar, los archivados siguen en el archivo y los ids continúan
+    def test_archive_survives_restart(self):
+        self.finish_ride(1)
+        before = self.client.get("/usuarios/conductor/rides/1").get_json()
+        self.restart()
+        self.assertNotIn(1, app_module.store.rides)
+        self.assertEqual(self.client.get("/usuarios/conductor/rides/1").get_json(), before)
+        self.client.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-20 22:00", "allowedSpaces": 4
+        })
+        self.assertIsNotNone(app_module.store.find_ride("conductor", 4))
+
+    #  Sin RIDES_ARCHIVE_GRACE el archivo se sigue leyendo y sus ids no se
+    # reutilizan, con o sin snapshot posterior al archivado
+    def test_restart_without_archiving(self):
+        c = self.client
+        self.finish_ride(1)
+        before = c.get("/usuarios/conductor/rides/1").get_json()
+        self.restart(archive_grace=None)
+        self.assertEqual(c.get("/usuarios/conductor/rides/1").get_json(), before)
+        c.post("/usuarios/conductor/rides/2/end")
+        self.sweeper.run_once()
+        self.assertIn(2, app_module.store.rides)
+        with app_module.store.rideLocks.all(), app_module.store.lock:
+            app_module.event_log.write_snapshot(dump_store(app_module.store))
+
+        self.restart(archive_grace=None)
+        rides = c.get("/usuarios/conductor/rides").get_json()
+        self.assertEqual([(r["id"], r["status"]) for r in rides], [(1, "done"), (2, "done"), (3, "ready")])
+        c.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-20 22:00", "allowedSpaces": 4
+        })
+        self.assertEqual([r["id"] for r in c.get("/usuarios/conductor/rides").get_json()], [1, 2, 3, 4])
+
+        self.restart()
+        self.sweeper.run_once()
+        self.assertEqual(sorted(app_module.store.rides), [3, 4])
+        self.assertEqual(c.get("/usuarios/conductor/rides/1").get_json(), before)
+
+    #  Una fila incompleta al final del archivo (caída) se descarta
+    def test_torn_archive_tail_is_ignored(self):
+        self.finish_ride(1)
+        with open(os.path.join(self.tmp.name, "archive.jsonl"), "ab") as f:
+            f.write(b'[2,"2025-07-11 22:00"')
+        self.restart()
+        self.assertEqual(len(app_module.store.archive), 1)
+        self.assertEqual(self.client.get("/usuarios/conductor/rides/2").get_json()["ride"]["status"], "ready")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_batch.py
+
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from store import MemoryStore
+
+class TestBatchEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.client = app_module.app.test_client()
+        self.client.post("/usuarios/batch", json={"users": [
+            {"alias": "conductor", "name": "Pedro"},
+            {"alias": "ana", "name": "Ana"},
+            {"alias": "luis", "name": "Luis"},
+            {"alias": "eva", "name": "Eva"},
+        ]})
+        self.client.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": 4
+        })
+        for alias in ("ana", "luis", "eva"):
+            self.client.post(f"/usuarios/conductor/rides/1/requestToJoin/{alias}", json={
+                "destination": "Barranco", "occupiedSpaces": 1
+            })
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    # ✅ Éxito: alta de usuarios en lote con un resultado por elemento
+    def test_create_users_batch(self):
+        response = self.client.post("/usuarios/batch", json={"users": [
+            {"alias": "nuevo", "name": "Nuevo"},
+            {"alias": "ana", "name": "Ana"},
+            {"name": "Sin alias"},
+        ]})
+        statuses = [r["status"] for r in response.get_json()["results"]]
+        self.assertEqual(statuses, [201, 422, 422])
+        self.assertIsNotNone(app_module.store.find_user("nuevo"))
+
+    #  Aceptar varios participantes en una sola llamada
+    def test_accept_batch(self):
+        response = self.client.post("/usuarios/conductor/rides/1/accept", json={
+            "participants": ["ana", "luis", "nadie"]
+        })
+        statuses = [r["status"] for r in response.get_json()["results"]]
+        self.assertEqual(statuses, [200, 200, 422])
+        ride = app_module.store.find_ride("conductor", 1)
+        self.assertEqual([p.status for p in ride.participants], ["confirmed", "confirmed", "waiting"])
+
+    #  Rechazar en lote libera los espacios y actualiza estadísticas
+    def test_reject_batch(self):
+        self.client.post("/usuarios/conductor/rides/1/reject", json={"participants": ["luis", "eva"]})
+        ride = app_module.store.find_ride("conductor", 1)
+        self.assertEqual(ride.remainingSpaces(), 3)
+        self.assertEqual(app_module.store.find_user("eva").previousRidesRejected, 1)
+
+    #  Error: lote vacío o ride inexistente
+    def test_invalid_batch(self):
+        self.assertEqual(self.client.post("/usuarios/conductor/rides/1/accept", json={}).status_code, 422)
+        self.assertEqual(self.client.post("/usuarios/batch", json={"users": []}).status_code, 422)
+        response = self.client.post("/usuarios/conductor/rides/9/accept", json={"participants": ["ana"]})
+        self.assertEqual(response.status_code, 404)
+
+    #  Error: los elementos mal tipados fallan uno por uno, sin abortar el lote
+    def test_batch_item_types(self):
+        response = self.client.post("/usuarios/conductor/rides/1/reject", json={
+            "participants": [{"a": 1}, ["luis"], "eva"]
+        })
+        self.assertEqual([r["status"] for r in response.get_json()["results"]], [422, 422, 200])
+        response = self.client.post("/usuarios/batch", json={"users": [
+            {"alias": ["x"], "name": "X"},
+            {"alias": "y", "name": {"n": 1}},
+            {"alias": "nuevo", "name": "Nuevo"},
+        ]})
+        self.assertEqual([r["status"] for r in response.get_json()["results"]], [422, 422, 201])
+        self.assertEqual(self.client.post("/usuarios/batch", json=[{"alias": "z", "name": "Z"}]).status_code, 422)
+        self.assertEqual(self.client.post("/usuarios", json=["z"]).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_cache.py
+
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from store import MemoryStore
+
+RIDE = "/usuarios/conductor/rides/1"
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.client = app_module.app.test_client()
+        self.client.post("/usuarios/batch", json={"users": [
+            {"alias": "conductor", "name": "Pedro"},
+            {"alias": "ana", "name": "Ana"},
+            {"alias": "luis", "name": "Luis"},
+        ]})
+        for _ in range(2):
+            self.client.post("/usuarios/conductor/rides", json={
+                "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": 4
+            })
+        for ride_id in (1, 2):
+            for alias in ("ana", "luis"):
+                self.client.post(f"/usuarios/conductor/rides/{ride_id}/requestToJoin/{alias}", json={
+                    "destination": "Barranco", "occupiedSpaces": 1
+                })
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+
+    def assertInvalidates(self, url, mutation):
+        first = self.client.get(url)
+        etag = first.headers["ETag"]
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        response = mutation()
+        self.assertLess(response.status_code, 300)
+        after = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after.headers["ETag"], etag)
+        self.assertNotEqual(after.get_json(), first.get_json())
+
+    # ✅ Éxito: sin cambios, el GET condicional responde 304 con el mismo ETag
+    def test_not_modified(self):
+        first = self.client.get(RIDE)
+        again = self.client.get(RIDE, headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(self.client.get(RIDE).get_json(), first.get_json())
+
+    #  Cada mutación del ride invalida su detalle
+    def test_ride_mutations_invalidate(self):
+        self.client.post("/usuarios", json={"alias": "eva", "name": "Eva"})
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/requestToJoin/eva", json={
+            "destination": "Lima", "occupiedSpaces": 1
+        }))
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/accept/ana"))
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/reject/luis"))
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/accept", json={"participants": ["eva"]}))
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/start"))
+        self.assertInvalidates(RIDE, lambda: self.client.post("/usuarios/ana/rides/1/unloadParticipant"))
+        self.assertInvalidates(RIDE, lambda: self.client.post(f"{RIDE}/end"))
+
+    #  Cambios de estadísticas desde otro ride invalidan el detalle y el perfil
+    def test_stats_from_other_ride_invalidate(self):
+        self.assertInvalidates(RIDE, lambda: self.client.post("/usuarios/conductor/rides/2/reject/ana"))
+        self.assertInvalidates("/usuarios/luis", lambda: self.client.post("/usuarios/conductor/rides/2/reject/luis"))
+
+    #  La caché LRU descarta la entrada menos usada
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c"), len(cache)), (1, 3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
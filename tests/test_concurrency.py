@@ -0,0 +1,71 @@
+# tests/test_concurrency.py
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import app as app_module
+from cache import LRUCache
+from concurrency import IdAllocator
+from models import User
+from store import MemoryStore
+
+JOINS = 2000
+THREADS = 32
+SPACES = 50
+
+class TestConcurrentBooking(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.local = threading.local()
+        client = app_module.app.test_client()
+        client.post("/usuarios", json={"alias": "conductor", "name": "Pedro"})
+        client.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": SPACES
+        })
+        for i in range(JOINS):
+            app_module.store.add_user(User(f"p{i}", f"P {i}"))
+
+    def client(self):
+        if not hasattr(self.local, "client"):
+            self.local.client = app_module.app.test_client()
+        return self.local.client
+
+    def join(self, i):
+        return self.client().post(f"/usuarios/conductor/rides/1/requestToJoin/p{i}", json={
+            "destination": "Destino", "occupiedSpaces": 1
+        }).status_code
+
+    #  Miles de solicitudes simultáneas nunca sobrevenden el ride
+    def test_concurrent_joins_do_not_overbook(self):
+        with ThreadPoolExecutor(THREADS) as pool:
+            codes = list(pool.map(self.join, range(JOINS)))
+
+        ride = app_module.store.find_ride("conductor", 1)
+        self.assertEqual(codes.count(200), SPACES)
+        self.assertEqual(codes.count(422), JOINS - SPACES)
+        self.assertEqual(len(ride.participants), SPACES)
+        self.assertEqual(ride.remainingSpaces(), 0)
+
+    #  Error: If-Match con una versión desactualizada devuelve 409
+    def test_stale_version_conflict(self):
+        client = self.client()
+        version = client.get("/usuarios/conductor/rides/1").headers["X-Ride-Version"]
+        self.assertEqual(self.join(0), 200)
+        response = client.post("/usuarios/conductor/rides/1/requestToJoin/p1", json={
+            "destination": "Destino", "occupiedSpaces": 1
+        }, headers={"If-Match": version})
+        self.assertEqual(response.status_code, 409)
+
+    #  Los ids se asignan sin duplicados entre hilos
+    def test_id_allocator_unique(self):
+        ids = IdAllocator()
+        with ThreadPoolExecutor(THREADS) as pool:
+            allocated = list(pool.map(lambda _: ids.next(), range(10000)))
+        self.assertEqual(len(set(allocated)), 10000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_metrics.py
+
+import time
+import unittest
+
+from flask import Flask, abort
+
+import app as app_module
+from cache import LRUCache
+from metrics import Metrics
+from store import MemoryStore
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        app_module.metrics._histograms.clear()
+        app_module.metrics._statuses.clear()
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    # ✅ Éxito: /metrics expone conteos por ruta y código, incluidos los abort
+    def test_status_counts_per_route(self):
+        self.client.post("/usuarios", json={"alias": "ana", "name": "Ana"})
+        self.client.post("/usuarios", json={"alias": "ana", "name": "Ana"})
+        self.client.get("/usuarios/nadie")
+        body = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('http_requests_total{method="POST",route="/usuarios",status="201"} 1', body)
+        self.assertIn('http_requests_total{method="POST",route="/usuarios",status="422"} 1', body)
+        self.assertIn('http_requests_total{method="GET",route="/usuarios/<alias>",status="404"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{method="POST",route="/usuarios"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{method="POST",route="/usuarios",le="+Inf"} 2', body)
+        self.assertIn("rides_users 1", body)
+
+    #  Los gauges del store salen de una sola llamada a counts() por scrape
+    def test_store_counts_once_per_scrape(self):
+        store = app_module.store
+        calls = []
+        counts = store.counts
+        store.counts = lambda: calls.append(1) or counts()
+        body = self.client.get("/metrics").get_data(as_text=True)
+        self.assertEqual(len(calls), 1)
+        for name in ("rides_users", "rides_rides", "rides_participations", "rides_searchable", "rides_archived"):
+            self.assertIn(f"# TYPE {name} gauge", body)
+
+    #  Los buckets del histograma son acumulativos
+    def test_histogram_buckets(self):
+        metrics = Metrics()
+        for seconds in (0.0001, 0.003, 0.003, 3.0):
+            metrics.observe("GET", "/x", 200, seconds)
+        body = metrics.render()
+        self.assertIn('le="0.0005"} 1', body)
+        self.assertIn('le="0.005"} 3', body)
+        self.assertIn('le="2.5"} 3', body)
+        self.assertIn('le="+Inf"} 4', body)
+
+    #  El log de solicitudes lentas incluye el perfil muestreado
+    def test_slow_request_log(self):
+        app = Flask(__name__)
+        Metrics(slow_ms=1, sample=1.0).init_app(app)
+
+        @app.route("/lento")
+        def slow():
+            time.sleep(0.005)
+            abort(422)
+
+        with self.assertLogs("rides.slow", level="WARNING") as logs:
+            self.assertEqual(app.test_client().get("/lento").status_code, 422)
+        self.assertIn("GET /lento (/lento) -> 422", logs.output[0])
+        self.assertIn("function calls", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
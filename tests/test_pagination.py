@@ -0,0 +1,84 @@
+# tests/test_pagination.py
+
+import json
+import tracemalloc
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from models import User, Ride
+from store import MemoryStore
+
+USERS = 20000
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        for i in range(USERS):
+            app_module.store.add_user(User(f"u{i}", f"Usuario {i}", f"PLACA{i}"))
+        driver = app_module.store.find_user("u0")
+        for _ in range(5):
+            app_module.store.add_ride(
+                Ride(app_module.store.next_ride_id(), "2025-07-15 22:00", "UTEC", 3, driver)
+            )
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    # ✅ Éxito: recorrer todas las páginas devuelve cada usuario una vez y en orden
+    def test_cursor_walks_all_users(self):
+        aliases, cursor = [], None
+        while True:
+            url = "/usuarios?limit=3000" + (f"&after={cursor}" if cursor else "")
+            response = self.client.get(url)
+            aliases += [u["alias"] for u in response.get_json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        self.assertEqual(aliases, [f"u{i}" for i in range(USERS)])
+
+    #  Los rides de un conductor también se paginan
+    def test_user_rides_page(self):
+        first = self.client.get("/usuarios/u0/rides?limit=2")
+        self.assertEqual([r["id"] for r in first.get_json()], [1, 2])
+        cursor = first.headers["X-Next-Cursor"]
+        second = self.client.get(f"/usuarios/u0/rides?limit=10&after={cursor}")
+        self.assertEqual([r["id"] for r in second.get_json()], [3, 4, 5])
+        self.assertNotIn("X-Next-Cursor", second.headers)
+
+    #  Error: cursor o límite inválidos
+    def test_invalid_cursor_and_limit(self):
+        self.assertEqual(self.client.get("/usuarios?after=%%%").status_code, 422)
+        self.assertEqual(self.client.get("/usuarios?limit=0").status_code, 422)
+
+    #  El modo streaming produce el mismo JSON que la respuesta completa
+    def test_stream_matches_full_response(self):
+        full = self.client.get("/usuarios").get_json()
+        streamed = self.client.get("/usuarios?stream=1")
+        self.assertEqual(json.loads(streamed.get_data()), full)
+        page = self.client.get("/usuarios?stream=1&limit=2&after=" + app_module.encode_cursor(10))
+        self.assertEqual([u["alias"] for u in json.loads(page.get_data())], ["u10", "u11"])
+
+    def peak_memory(self, url):
+        tracemalloc.start()
+        response = self.client.get(url, buffered=False)
+        for _ in response.response:
+            pass
+        response.close()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    #  El streaming usa una fracción de la memoria de la respuesta completa
+    def test_stream_uses_less_memory(self):
+        full = self.peak_memory("/usuarios")
+        streamed = self.peak_memory("/usuarios?stream=1")
+        self.assertLess(streamed * 10, full)
+
+
+if __name__ == "__main__":
+    unittest.main()
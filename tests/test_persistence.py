@@ -0,0 +1,136 @@
+# tests/test_persistence.py
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from persistence import open_store, dump_store
+from store import MemoryStore
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.open(snapshot_every=1000)
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.event_log.close()
+        app_module.store, app_module.event_log = MemoryStore(), None
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.tmp.cleanup()
+
+    def open(self, snapshot_every):
+        app_module.store, app_module.event_log = open_store(self.tmp.name, snapshot_every)
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    def restart(self, snapshot_every=1000):
+        before = dump_store(app_module.store)
+        app_module.event_log.close()
+        self.open(snapshot_every)
+        return before
+
+    def run_workload(self):
+        c = self.client
+        c.post("/usuarios", json={"alias": "conductor", "name": "Pedro", "carPlate": "ABC123"})
+        for alias in ("ana", "luis", "eva"):
+            c.post("/usuarios", json={"alias": alias, "name": alias.title()})
+        c.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": 4
+        })
+        for alias in ("ana", "luis", "eva"):
+            c.post(f"/usuarios/conductor/rides/1/requestToJoin/{alias}", json={
+                "destination": "Barranco", "occupiedSpaces": 1
+            })
+        c.post("/usuarios/conductor/rides/1/accept/ana")
+        c.post("/usuarios/conductor/rides/1/accept/luis")
+        c.post("/usuarios/conductor/rides/1/reject/eva")
+        c.post("/usuarios/conductor/rides/1/start")
+        c.post("/usuarios/ana/rides/1/unloadParticipant")
+        c.post("/usuarios/conductor/rides/1/end")
+
+    # ✅ Éxito: el estado se reconstruye igual tras reiniciar
+    def test_replay_restores_state(self):
+        self.run_workload()
+        before = self.restart()
+        self.assertEqual(dump_store(app_module.store), before)
+
+    #  Con snapshots, sólo se reproduce la cola del log
+    def test_snapshot_compacts_log(self):
+        app_module.event_log.close()
+        self.open(snapshot_every=5)
+        self.run_workload()
+        app_module.event_log.wait_snapshot()
+        self.assertTrue(os.path.exists(app_module.event_log.snapshotPath))
+        self.assertFalse(os.path.exists(app_module.event_log.oldLogPath))
+        with open(app_module.event_log.logPath) as f:
+            self.assertLess(len(f.readlines()), 5)
+        before = self.restart()
+        self.assertEqual(dump_store(app_module.store), before)
+
+    #  Una caída entre la rotación del log y el snapshot no pierde eventos
+    def test_interrupted_snapshot_keeps_events(self):
+        self.run_workload()
+        app_module.event_log._rotate()  # como si el hilo del snapshot no llegara a escribir
+        self.client.post("/usuarios", json={"alias": "nuevo", "name": "Nuevo"})
+        before = self.restart()
+        self.assertEqual(dump_store(app_module.store), before)
+        self.assertIsNotNone(app_module.store.find_user("nuevo"))
+
+    #  Una línea incompleta al final del log (caída) se descarta
+    def test_torn_tail_is_ignored(self):
+        self.run_workload()
+        before = dump_store(app_module.store)
+        app_module.event_log.close()
+        with open(os.path.join(self.tmp.name, "events.jsonl"), "a") as f:
+            f.write('{"seq":999,"type":"us')
+        self.open(snapshot_every=1000)
+        self.assertEqual(dump_store(app_module.store), before)
+
+    #  Los ids de ride siguen después del último recuperado
+    def test_ride_ids_continue_after_restart(self):
+        self.run_workload()
+        self.restart()
+        response = self.client.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-16 22:00", "allowedSpaces": 2
+        })
+        self.assertEqual(response.get_json()["message"], "Ride creado con id 2")
+
+    #  Un join concurrente con el alta de su usuario no queda antes que ella
+    # en el log, así que el log se puede reproducir
+    def test_concurrent_creation_replays(self):
+        c = self.client
+        c.post("/usuarios", json={"alias": "conductor", "name": "Pedro", "carPlate": "ABC123"})
+        c.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": 4
+        })
+        log = app_module.event_log
+        write = log.write
+
+        def slow_write(event_type, **fields):
+            if event_type == "user_created":
+                time.sleep(0.2)
+            return write(event_type, **fields)
+
+        log.write = slow_write
+        creator = threading.Thread(target=lambda: app_module.app.test_client().post(
+            "/usuarios", json={"alias": "ana", "name": "Ana"}))
+        creator.start()
+        status = 404
+        while status == 404:
+            status = c.post("/usuarios/conductor/rides/1/requestToJoin/ana", json={
+                "destination": "Barranco", "occupiedSpaces": 1
+            }).status_code
+        creator.join()
+        del log.write
+        self.assertEqual(status, 200)
+        before = self.restart()
+        self.assertEqual(dump_store(app_module.store), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_search.py
+
+import unittest
+
+import app as app_module
+from cache import LRUCache
+from store import MemoryStore
+
+RIDES = [
+    ("2025-07-15 08:00", "UTEC Barranco", 3),
+    ("2025-07-15 09:30", "Av. Javier Prado, San Isidro", 2),
+    ("2025-07-15 18:00", "Jirón de la Unión, Lima", 4),
+    ("2025-07-16 07:45", "UTEC, Barranco", 1),
+]
+
+class TestRideSearch(unittest.TestCase):
+
+    def setUp(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.client = app_module.app.test_client()
+        self.client.post("/usuarios/batch", json={"users": [
+            {"alias": "conductor", "name": "Pedro"}, {"alias": "ana", "name": "Ana"}
+        ]})
+        for dt, address, spaces in RIDES:
+            self.client.post("/usuarios/conductor/rides", json={
+                "finalAddress": address, "rideDateAndTime": dt, "allowedSpaces": spaces
+            })
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    def search(self, query):
+        response = self.client.get("/rides/search" + query)
+        self.assertEqual(response.status_code, 200)
+        return [r["id"] for r in response.get_json()]
+
+    # ✅ Éxito: filtro por ventana de tiempo, ordenado por fecha
+    def test_time_window(self):
+        self.assertEqual(self.search("?from=2025-07-15 09:00&to=2025-07-15 23:59"), [2, 3])
+        self.assertEqual(self.search(""), [1, 2, 3, 4])
+
+    #  Palabras clave del destino, sin distinguir mayúsculas ni tildes
+    def test_keywords(self):
+        self.assertEqual(self.search("?q=utec barranco"), [1, 4])
+        self.assertEqual(self.search("?q=JIRON"), [3])
+        self.assertEqual(self.search("?q=utec&from=2025-07-16"), [4])
+        self.assertEqual(self.search("?q=miraflores"), [])
+
+    #  Sólo rides con espacios suficientes
+    def test_min_seats(self):
+        self.client.post("/usuarios/conductor/rides/1/requestToJoin/ana", json={
+            "destination": "Barranco", "occupiedSpaces": 2
+        })
+        self.assertEqual(self.search("?minSeats=2"), [2, 3])
+
+    #  Los rides iniciados o terminados dejan de aparecer
+    def test_started_and_ended_rides_leave_index(self):
+        self.client.post("/usuarios/conductor/rides/1/start")
+        self.client.post("/usuarios/conductor/rides/2/end")
+        self.assertEqual(self.search(""), [3, 4])
+
+    #  Error: datos de ride con tipos inválidos no crean nada
+    def test_invalid_ride_types(self):
+        for data in (
+            {"finalAddress": "UTEC", "rideDateAndTime": 20250101, "allowedSpaces": 2},
+            {"finalAddress": ["UTEC"], "rideDateAndTime": "2025-07-17 08:00", "allowedSpaces": 2},
+            {"finalAddress": "UTEC", "rideDateAndTime": "2025-07-17 08:00", "allowedSpaces": "2"},
+            {"finalAddress": "UTEC", "rideDateAndTime": "2025-07-17 08:00", "allowedSpaces": -1},
+        ):
+            self.assertEqual(self.client.post("/usuarios/conductor/rides", json=data).status_code, 422)
+        self.assertEqual(self.client.post("/usuarios/conductor/rides", json=["UTEC"]).status_code, 422)
+        self.assertEqual(len(self.client.get("/usuarios/conductor/rides").get_json()), 4)
+        self.assertEqual(self.search(""), [1, 2, 3, 4])
+
+    #  Error: límite fuera de rango
+    def test_invalid_limit(self):
+        self.assertEqual(self.client.get("/rides/search?limit=0").status_code, 422)
+        self.assertEqual(self.search("?limit=1"), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+# tests/test_sqlite_store.py
+
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import app as app_module
+import sqlite_store
+from cache import LRUCache
+from models import User, CONFIRMED
+from sqlite_store import SqliteStore
+from store import MemoryStore
+
+PROCESSES = 4
+JOINS_PER_PROCESS = 25
+SPACES = 10
+
+# Corre en otro proceso: abre su propia conexión al mismo archivo.
+def join_from_process(path, aliases):
+    app_module.store = SqliteStore(path)
+    client = app_module.app.test_client()
+    return [client.post(f"/usuarios/conductor/rides/2/requestToJoin/{alias}", json={
+        "destination": "Barranco", "occupiedSpaces": 1
+    }).status_code for alias in aliases]
+
+class TestSqliteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rides.db")
+        self.store = app_module.store = SqliteStore(self.path)
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.client = app_module.app.test_client()
+        self.populate()
+
+    def tearDown(self):
+        self.store.close()
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.tmp.cleanup()
+
+    def populate(self):
+        c = self.client
+        c.post("/usuarios", json={"alias": "conductor", "name": "Pedro", "carPlate": "ABC123"})
+        for alias in ("ana", "luis", "eva"):
+            c.post("/usuarios", json={"alias": alias, "name": alias.title()})
+        c.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC Barranco", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": 3
+        })
+
+    def join(self, alias):
+        return self.client.post(f"/usuarios/conductor/rides/1/requestToJoin/{alias}", json={
+            "destination": "Barranco", "occupiedSpaces": 1
+        }).status_code
+
+    def run_lifecycle(self):
+        c = self.client
+        self.assertEqual(self.join("ana"), 200)
+        self.assertEqual(self.join("luis"), 200)
+        self.assertEqual(c.post("/usuarios/conductor/rides/1/accept/ana").status_code, 200)
+        self.assertEqual(c.post("/usuarios/conductor/rides/1/reject/luis").status_code, 200)
+        self.assertEqual(c.post("/usuarios/conductor/rides/1/start").status_code, 200)
+        self.assertEqual(c.post("/usuarios/ana/rides/1/unloadParticipant").status_code, 200)
+        self.assertEqual(c.post("/usuarios/conductor/rides/1/end").status_code, 200)
+        return [c.get(path).get_json() for path in
+                ("/usuarios/conductor/rides/1", "/usuarios/ana", "/usuarios/luis", "/usuarios/conductor/rides")]
+
+    # ✅ Éxito: el ciclo completo queda guardado en la base
+    def test_ride_lifecycle(self):
+        self.run_lifecycle()
+
+        # Un store nuevo sobre el mismo archivo ve el mismo estado.
+        store = SqliteStore(self.path)
+        ride = store.find_ride("conductor", 1)
+        self.assertEqual(ride.status, "done")
+        self.assertEqual([(p.participant.alias, p.status) for p in ride.participants],
+                         [("ana", "done"), ("luis", "rejected")])
+        self.assertEqual(store.find_user("ana").previousRidesCompleted, 1)
+        self.assertEqual(store.find_user("luis").previousRidesRejected, 1)
+        store.close()
+
+    # ✅ Éxito: las respuestas son las mismas que con MemoryStore
+    def test_matches_memory_store(self):
+        on_sqlite = self.run_lifecycle()
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+        self.populate()
+        self.assertEqual(self.run_lifecycle(), on_sqlite)
+
+    #  Error: una transición inválida no deja cambios a medias
+    def test_invalid_transition_is_rejected(self):
+        self.join("ana")
+        self.client.post("/usuarios/conductor/rides/1/reject/ana")
+        self.assertEqual(self.client.post("/usuarios/conductor/rides/1/accept/ana").status_code, 422)
+        ride = app_module.store.find_ride_by_id(1)
+        self.assertEqual(ride.participants[0].status, "rejected")
+        self.assertEqual(ride.remainingSpaces(), 3)
+
+    #  El ride y sus participantes se leen de la misma versión de la base
+    def test_ride_read_is_consistent(self):
+        self.join("ana")
+        build = sqlite_store._ride
+
+        # Otro proceso cambia la participación entre la lectura del ride y la
+        # de sus participantes.
+        def build_then_write(row):
+            other = sqlite3.connect(self.path)
+            other.execute("UPDATE participations SET status = ? WHERE ride = 1", (CONFIRMED,))
+            other.commit()
+            other.close()
+            return build(row)
+
+        sqlite_store._ride = build_then_write
+        try:
+            ride = app_module.store.find_ride_by_id(1)
+        finally:
+            sqlite_store._ride = build
+        self.assertEqual(ride.version, 1)
+        self.assertEqual(ride.participants[0].status, "waiting")
+        self.assertEqual(app_module.store.find_ride_by_id(1).participants[0].status, "confirmed")
+
+    #  Paginación y búsqueda se resuelven con consultas
+    def test_pagination_and_search(self):
+        for _ in range(2):
+            self.client.post("/usuarios/conductor/rides", json={
+                "finalAddress": "Miraflores", "rideDateAndTime": "2025-07-16 08:00", "allowedSpaces": 3
+            })
+        page = self.client.get("/usuarios/conductor/rides?limit=2")
+        self.assertEqual([r["id"] for r in page.get_json()], [1, 2])
+        rest = self.client.get(f"/usuarios/conductor/rides?after={page.headers['X-Next-Cursor']}")
+        self.assertEqual([r["id"] for r in rest.get_json()], [3])
+        self.assertNotIn("X-Next-Cursor", rest.headers)
+        self.assertEqual(len(self.client.get("/usuarios?stream=1").get_json()), 4)
+
+        found = self.client.get("/rides/search?q=barranco").get_json()
+        self.assertEqual([r["id"] for r in found], [1])
+        found = self.client.get("/rides/search?from=2025-07-16&minSeats=3").get_json()
+        self.assertEqual([r["id"] for r in found], [2, 3])
+
+    #  Varios procesos comparten la base sin sobrevender el ride
+    def test_processes_do_not_overbook(self):
+        self.client.post("/usuarios/conductor/rides", json={
+            "finalAddress": "UTEC", "rideDateAndTime": "2025-07-15 22:00", "allowedSpaces": SPACES
+        })
+        batches = []
+        for p in range(PROCESSES):
+            aliases = [f"p{p}_{i}" for i in range(JOINS_PER_PROCESS)]
+            for alias in aliases:
+                app_module.store.add_user(User(alias, alias))
+            batches.append((self.path, aliases))
+
+        with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+            codes = [code for result in pool.starmap(join_from_process, batches) for code in result]
+
+        ride = app_module.store.find_ride("conductor", 2)
+        self.assertEqual(codes.count(200), SPACES)
+        self.assertEqual(len(ride.participants), SPACES)
+        self.assertEqual(ride.remainingSpaces(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
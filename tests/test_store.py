@@ -0,0 +1,65 @@
+# tests/test_store.py
+
+import unittest
+from models import User, Ride, RideParticipation
+from store import MemoryStore, StorageBackend
+
+class TestMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MemoryStore()
+        self.driver = self.store.add_user(User("conductor", "Pedro"))
+        self.ride = self.store.add_ride(
+            Ride(self.store.next_ride_id(), "2025-07-17 12:00", "UTEC", 4, self.driver)
+        )
+
+    # ✅ Éxito: búsqueda de usuario y ride por sus índices
+    def test_find_user_and_ride(self):
+        self.assertIs(self.store.find_user("conductor"), self.driver)
+        self.assertIs(self.store.find_ride("conductor", self.ride.id), self.ride)
+        self.assertIs(self.store.find_ride_by_id(self.ride.id), self.ride)
+        self.assertEqual(list(self.store.rides_of("conductor")), [self.ride])
+
+    #  Error: ride de otro conductor o inexistente
+    def test_find_ride_wrong_driver(self):
+        self.assertIsNone(self.store.find_ride("otro", self.ride.id))
+        self.assertIsNone(self.store.find_ride("conductor", 99))
+        self.assertEqual(list(self.store.rides_of("otro")), [])
+
+    #  Error: si falla el índice de búsqueda, el ride no queda a medias
+    def test_add_ride_failure_leaves_no_ride(self):
+        ride = Ride(None, 20250101, "UTEC", 4, self.driver)
+        with self.assertRaises(TypeError):
+            self.store.add_ride(ride)
+        self.assertIsNone(self.store.find_ride_by_id(ride.id))
+        self.assertEqual(list(self.store.rides_of("conductor")), [self.ride])
+        self.assertEqual(len(self.store.rideIndex), 1)
+
+    #  Los ids de ride son consecutivos
+    def test_next_ride_id(self):
+        self.assertEqual(self.store.next_ride_id(), self.ride.id + 1)
+
+    #  La participación queda indexada por alias en el ride
+    def test_add_participation(self):
+        ana = self.store.add_user(User("ana", "Ana"))
+        rp = self.store.add_participation(self.ride, RideParticipation(ana, "Destino 1", 1))
+        self.assertIs(self.store.find_participation(self.ride, "ana"), rp)
+        self.assertIsNone(self.store.find_participation(self.ride, "luis"))
+        self.assertEqual(self.ride.participants, [rp])
+        self.assertEqual(list(ana.rides), [rp])
+        # Vista de sólo lectura: un append por error falla en vez de perderse
+        with self.assertRaises(AttributeError):
+            ana.rides.append(rp)
+
+
+    #  Error: un backend incompleto falla al construirse
+    def test_incomplete_backend(self):
+        class Incomplete(StorageBackend):
+            def find_user(self, alias):
+                return None
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+if __name__ == "__main__":
+    unittest.main()
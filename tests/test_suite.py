@@ -0,0 +1,57 @@
+# tests/test_suite.py
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import app as app_module
+from cache import LRUCache
+import suite
+from store import MemoryStore
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def tearDown(self):
+        app_module.store = MemoryStore()
+        app_module.responses = LRUCache(app_module.RESPONSE_CACHE_SIZE)
+
+    # ✅ Éxito: cada workload corre contra la app sin errores del servidor
+    def test_workloads_run(self):
+        transport = suite.ClientTransport()
+        for name, workload in suite.WORKLOADS.items():
+            suite.preload(20)
+            calls = [(*c, None) for c in workload(20, 12)]
+            report = suite.run(transport, calls, threads=2)
+            self.assertTrue(report, name)
+            for route, stats in report.items():
+                self.assertFalse([s for s in stats["statuses"] if s.startswith("5")], route)
+                self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+
+    #  El replay ignora líneas que no son solicitudes
+    def test_load_replay(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write(json.dumps({"method": "get", "path": "/usuarios"}) + "\n")
+            f.write(json.dumps({"request_id": "x", "title": "no es tráfico"}) + "\n")
+            f.write("no es json\n")
+        try:
+            self.assertEqual(suite.load_replay(f.name), [("GET", "/usuarios", None, None)])
+        finally:
+            os.unlink(f.name)
+
+    #  Percentiles y detección de regresiones
+    def test_percentile_and_compare(self):
+        values = list(range(1, 101))
+        self.assertEqual((suite.percentile(values, 50), suite.percentile(values, 99)), (50, 99))
+        route = {"GET /usuarios": {"p95_ms": 1.0}}
+        baseline = {"results": [{"size": 10, "workload": "w", "routes": route}]}
+        slower = [{"size": 10, "workload": "w", "routes": {"GET /usuarios": {"p95_ms": 2.0}}}]
+        self.assertEqual(len(suite.compare(baseline, slower)), 1)
+        self.assertEqual(suite.compare(baseline, baseline["results"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()